@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Coste por paquete de la captura según backend y snaplen (requiere root)
+Ejecutar: sudo python benchmarks/bench_capture.py [paquetes]
+
+Envía datagramas UDP grandes por loopback con el socket de captura ya
+abierto y después mide cuánto cuesta vaciarlo (recv + parser rápido).
+Así solo se mide el lado de captura, sin competir con el emisor. Se
+comparan el socket de Scapy (un recvmsg por trama) y el anillo TPACKET_V3
+(un bloque de tramas por lectura). La
+segunda parte repite la ráfaga con un buffer pequeño para comprobar los
+contadores de descartes del kernel (PACKET_STATISTICS).
+"""
+
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import conf
+
+from network.capture import open_capture
+from network.engine import decode_frame
+
+PAYLOAD = b"x" * 1400
+BUFFER_SIZE = 256 * 1024 * 1024
+SMALL_BUFFER_SIZE = 4 * 1024 * 1024
+BACKENDS = [("socket", 0), ("socket", 128), ("mmap", 0), ("mmap", 128)]
+
+
+def send_burst(count):
+    """Enviar 'count' datagramas a un socket local que no los lee"""
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for _ in range(count):
+        sender.sendto(PAYLOAD, receiver.getsockname())
+    sender.close()
+    receiver.close()
+
+
+def drain(capture):
+    """Leer y decodificar todo lo encolado; devuelve (paquetes, segundos)"""
+    packets = 0
+    start = end = time.perf_counter()
+    while True:
+        batch = capture.read_batch(0.2)
+        if not batch:
+            # La última espera vacía no cuenta como trabajo
+            return packets, end - start
+        for frame, _, linktype in batch:
+            decode_frame(frame, linktype)
+        packets += len(batch)
+        end = time.perf_counter()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    conf.iface = "lo"
+
+    print("CAPTURA: BACKEND Y SNAPLEN")
+    print("=" * 50)
+    for buffer_size in (BUFFER_SIZE, SMALL_BUFFER_SIZE):
+        print(f"Buffer del socket: {buffer_size // 1024} KiB, {count} datagramas")
+        for backend, snaplen in BACKENDS:
+            capture = open_capture("", snaplen, buffer_size, backend)
+            send_burst(count)
+            packets, elapsed = drain(capture)
+            received, dropped = capture.drop_stats()
+            capture.close()
+            print(
+                f"  {backend:6s} snaplen {snaplen or 'completo':>8}: "
+                f"{elapsed / max(packets, 1) * 1e6:6.2f} us/paquete "
+                f"({packets} leídos, kernel {received} recibidos, "
+                f"{dropped} descartados)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput de KMeansClassifier según tamaño de lote
+Ejecutar: python benchmarks/bench_classifier.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from models.model_loader import ModelLoader
+from models.packet_classifier import KMeansClassifier
+
+
+def bench_batch_size(classifier, features, batch_size):
+    """Devolver filas/s clasificando 'features' en lotes de batch_size"""
+    total = len(features) - len(features) % batch_size
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        classifier.classify_batch(features[offset : offset + batch_size])
+    elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main():
+    loader = ModelLoader()
+    classifier = KMeansClassifier(loader.get_model(), loader.get_scaler())
+
+    rng = np.random.default_rng(42)
+    features = rng.random((65536, 8)) * [10, 100, 100, 1, 1, 1500, 500, 1000]
+
+    print("BENCHMARK CLASIFICADOR K-MEANS")
+    print("=" * 40)
+    for batch_size in (1, 32, 256, 4096):
+        # Con lotes de 1 basta una muestra pequeña (cada llamada es lenta)
+        rows = features[:2000] if batch_size == 1 else features
+        rate = bench_batch_size(classifier, rows, batch_size)
+        print(f"Lote {batch_size:>5}: {rate:12,.0f} filas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Reporte de memoria del FlowTracker con muchos flujos concurrentes
+Ejecutar: python benchmarks/bench_flow_memory.py [num_flujos] [paquetes_por_flujo]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.flow_tracker import FlowTracker
+
+
+def measure(num_flows, packets_per_flow, history_size=0):
+    """Devolver bytes por flujo tras insertar num_flows flujos"""
+    tracker = FlowTracker(history_size=history_size)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    timestamp = 0.0
+    for n in range(packets_per_flow):
+        for i in range(num_flows):
+            timestamp += 0.000001
+            tracker.add_packet(
+                "10.0.0.1", "10.0.0.2", 1024 + i % 60000, i, "TCP", 100 + n, timestamp
+            )
+
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (current - baseline) / num_flows
+
+
+def main():
+    num_flows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    packets_per_flow = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("REPORTE DE MEMORIA FLOW TRACKER")
+    print("=" * 40)
+    for history_size in (0, 16):
+        per_flow = measure(num_flows, packets_per_flow, history_size)
+        print(
+            f"historial={history_size:>2}: {per_flow:7.1f} bytes/flujo, "
+            f"{per_flow * num_flows / 2**20:8.1f} MiB para {num_flows} flujos"
+        )
+
+
+if __name__ == "__main__":
+    main()
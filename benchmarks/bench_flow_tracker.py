@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark del FlowTracker: costo por paquete según la longitud del flujo
+Ejecutar: python benchmarks/bench_flow_tracker.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.flow_tracker import FlowTracker
+
+
+def bench_flow_length(flow_length, sample=1000):
+    """Medir el costo de add_packet + calculate_flow_features al final del flujo"""
+    tracker = FlowTracker()
+    timestamp = 0.0
+
+    # Llenar el flujo hasta la longitud deseada (sin medir)
+    for _ in range(flow_length - sample):
+        timestamp += 0.001
+        tracker.add_packet("10.0.0.1", "10.0.0.2", 40000, 443, "TCP", 1200, timestamp)
+
+    # Medir solo los últimos 'sample' paquetes
+    start = time.perf_counter()
+    for _ in range(sample):
+        timestamp += 0.001
+        key = tracker.add_packet(
+            "10.0.0.1", "10.0.0.2", 40000, 443, "TCP", 1200, timestamp
+        )
+        tracker.calculate_flow_features(key)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / sample * 1e6
+
+
+def main():
+    print("BENCHMARK FLOW TRACKER")
+    print("=" * 40)
+    for flow_length in (10, 1_000, 100_000):
+        sample = min(flow_length, 1000)
+        us_per_packet = bench_flow_length(flow_length, sample)
+        print(f"Flujo de {flow_length:>7} paquetes: {us_per_packet:8.2f} us/paquete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Prueba de estrés de la GUI: inyecta ~50k paquetes/s y mide latencia de refresco
+Ejecutar: python benchmarks/bench_gui.py [paquetes_por_seg] [segundos]
+(sin pantalla: QT_QPA_PLATFORM=offscreen python benchmarks/bench_gui.py)
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from config.settings import GUI_REFRESH_INTERVAL
+from gui.components.packet_table import PacketTableManager
+from network.packet_record import PacketRecord, Classification, Method
+from network.packet_sniffer import drain_queue
+
+
+def producer(queue, rate, duration, produced):
+    """Generar PacketRecords a 'rate' paquetes/s en ráfagas de 1 ms"""
+    start = time.perf_counter()
+    number = 0
+    while True:
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            break
+        target = int(elapsed * rate)
+        while number < target:
+            number += 1
+            record = PacketRecord(
+                number, elapsed, "10.0.0.1", "10.0.0.2", 6, 40000, 443, 1200
+            )
+            if random.random() < 0.1:
+                record.classification = Classification.ANOMALO
+            record.method = Method.KMEANS
+            record.cluster = 1
+            queue.append(record)
+        time.sleep(0.001)
+    produced.append(number)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    app = QApplication(sys.argv)
+    table = PacketTableManager()
+    table.resize(1200, 700)
+    table.show()
+
+    queue = deque()
+    produced = []
+    frame_times = []
+    tick_gaps = []
+    last_tick = [time.perf_counter()]
+
+    def on_frame():
+        now = time.perf_counter()
+        tick_gaps.append(now - last_tick[0])
+        last_tick[0] = now
+
+        records = drain_queue(queue)
+        if records:
+            table.add_packets(records)
+        frame_times.append(time.perf_counter() - now)
+
+    timer = QTimer()
+    timer.timeout.connect(on_frame)
+    timer.start(GUI_REFRESH_INTERVAL)
+
+    thread = threading.Thread(
+        target=producer, args=(queue, rate, duration, produced), daemon=True
+    )
+    thread.start()
+
+    def finish():
+        if thread.is_alive():
+            return
+        on_frame()
+        app.quit()
+
+    stopper = QTimer()
+    stopper.timeout.connect(finish)
+    stopper.start(100)
+    app.exec_()
+
+    stats = table.get_statistics()
+    print("ESTRÉS DE GUI")
+    print("=" * 40)
+    print(f"Paquetes inyectados: {produced[0]} ({produced[0] / duration:,.0f}/s)")
+    print(f"Contados por la GUI: {stats['total_packets']} (exactos)")
+    print(f"Filas omitidas por muestreo: {stats['sampled_out_packets']}")
+    print(f"Refrescos: {len(frame_times)}")
+    print(
+        f"Tiempo de refresco p50/p99: {percentile(frame_times, 50) * 1e3:.2f} / "
+        f"{percentile(frame_times, 99) * 1e3:.2f} ms"
+    )
+    print(
+        f"Intervalo entre refrescos p50/p99: {percentile(tick_gaps, 50) * 1e3:.1f} / "
+        f"{percentile(tick_gaps, 99) * 1e3:.1f} ms (objetivo {GUI_REFRESH_INTERVAL} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Retraso de detección bajo inundación, con y sin descarte de carga
+Ejecutar: python benchmarks/bench_load_shedding.py [paquetes/s] [segundos]
+
+Se ofrece tráfico sintético a un ritmo mayor del que el motor procesa.
+Cada trama lleva como marca su instante de llegada teórico; el retraso es
+la diferencia entre ese instante y el momento en que se procesa.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import Ether, IP, UDP, Raw
+
+from network.engine import DetectionEngine
+from network.load_shedder import LoadShedder
+
+
+def flood_frames(flows=5000):
+    """Una trama UDP por flujo (se recorren en bucle)"""
+    return [
+        bytes(
+            Ether()
+            / IP(src=f"10.{flow // 250 % 250}.{flow % 250}.1", dst="192.168.1.10")
+            / UDP(sport=20000 + flow % 40000, dport=9000)
+            / Raw(b"x" * 64)
+        )
+        for flow in range(flows)
+    ]
+
+
+def run(engine, frames, rate, duration):
+    """Ofrecer 'rate' paquetes/s durante 'duration' s; devuelve retraso máximo"""
+    start = time.time()
+    engine.start_time = start
+    total = int(rate * duration)
+    max_lag = 0.0
+    for i in range(total):
+        arrival = start + i / rate
+        now = time.time()
+        if arrival > now:
+            time.sleep(arrival - now)
+        engine.process_frame(frames[i % len(frames)], arrival)
+        if i % 64 == 0:
+            lag = time.time() - arrival
+            max_lag = max(max_lag, lag)
+            engine.shedder.observe_lag(lag)
+    engine.batcher.flush()
+    return total, max_lag
+
+
+def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    frames = flood_frames()
+
+    print("DESCARTE DE CARGA BAJO INUNDACIÓN")
+    print("=" * 60)
+    print(f"Ofrecido: {rate:,.0f} paquetes/s durante {duration:.0f} s")
+    for mode in ("off", "adaptive"):
+        engine = DetectionEngine(packet_filter="")
+        engine.shedder = LoadShedder(mode=mode, adapt_interval=0.25)
+        total, max_lag = run(engine, frames, rate, duration)
+        stats = engine.shedder.get_statistics()
+        print(
+            f"{mode:9s} retraso máx {max_lag:6.2f} s, procesados "
+            f"{engine.packet_count:>8,}, omitidos {stats['shed_packets']:>8,}, "
+            f"muestreo final 1/{stats['sample_rate']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
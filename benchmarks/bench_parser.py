@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Equivalencia y velocidad del parser rápido frente a la disección de Scapy
+Ejecutar: python benchmarks/bench_parser.py [captura.pcap]
+
+Sin argumentos se genera un corpus sintético (TCP, UDP, ICMP, VLAN,
+fragmentos IPv4, IPv6 con extensiones).
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import (
+    Dot1Q,
+    Ether,
+    ICMP,
+    IP,
+    IPv6,
+    IPv6ExtHdrHopByHop,
+    TCP,
+    UDP,
+    Raw,
+    conf,
+)
+
+from network.engine import dissect_with_scapy
+from network.fast_parser import parse_frame, UnsupportedFrame, DLT_EN10MB
+from network.replay import read_raw_frames
+
+
+def synthetic_corpus(count=20000):
+    """Generar tramas Ethernet variadas como bytes"""
+    templates = [
+        Ether() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=40000, dport=443),
+        Ether() / IP(src="10.0.0.3", dst="8.8.8.8") / UDP(sport=5353, dport=9999),
+        Ether() / IP(src="10.0.0.4", dst="10.0.0.5") / ICMP(),
+        Ether() / Dot1Q(vlan=10) / IP(src="10.1.0.1", dst="10.1.0.2") / TCP(dport=22),
+        Ether() / IP(src="10.0.0.6", dst="10.0.0.7", frag=10, proto=6) / Raw(b"x" * 40),
+        Ether() / IPv6(src="fe80::1", dst="2001:db8::2") / TCP(sport=1234, dport=80),
+        Ether() / IPv6(src="::1", dst="::2") / IPv6ExtHdrHopByHop() / UDP(dport=53),
+    ]
+    frames = [bytes(t / Raw(b"p" * 200)) for t in templates]
+    return [(frames[i % len(frames)], 0.0, DLT_EN10MB) for i in range(count)]
+
+
+def scapy_fields(frame, linktype):
+    layer = conf.l2types.num2layer.get(linktype, conf.raw_layer)
+    return dissect_with_scapy(layer(frame))
+
+
+def main():
+    if len(sys.argv) > 1:
+        corpus = list(read_raw_frames(sys.argv[1]))
+    else:
+        corpus = synthetic_corpus()
+
+    # Equivalencia campo a campo
+    mismatches = unsupported = 0
+    for frame, _, linktype in corpus:
+        try:
+            fast = parse_frame(frame, linktype)
+        except UnsupportedFrame:
+            unsupported += 1
+            continue
+        if fast != scapy_fields(frame, linktype):
+            mismatches += 1
+
+    # Velocidad
+    start = time.perf_counter()
+    for frame, _, linktype in corpus:
+        try:
+            parse_frame(frame, linktype)
+        except UnsupportedFrame:
+            pass
+    fast_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame, _, linktype in corpus:
+        scapy_fields(frame, linktype)
+    scapy_elapsed = time.perf_counter() - start
+
+    n = len(corpus)
+    print("PARSER RÁPIDO VS SCAPY")
+    print("=" * 40)
+    print(f"Tramas: {n}, diferencias: {mismatches}, no soportadas: {unsupported}")
+    print(f"Parser rápido: {fast_elapsed / n * 1e6:8.2f} us/trama")
+    print(f"Scapy:         {scapy_elapsed / n * 1e6:8.2f} us/trama")
+    print(f"Aceleración:   {scapy_elapsed / fast_elapsed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Escalado del pipeline multiproceso según el número de trabajadores
+Ejecutar: python benchmarks/bench_pipeline.py [captura.pcap]
+
+Sin argumentos se genera una captura sintética con muchos flujos
+concurrentes. "0" es el motor de un solo proceso como referencia.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import Ether, IP, TCP, UDP, Raw, wrpcap
+
+from network.engine import DetectionEngine
+from network.pipeline import ShardedPipeline
+from network.replay import replay_pcap
+
+WORKER_COUNTS = [0, 1, 2, 4, 8]
+
+
+def synthetic_pcap(path, count=50000, flows=2000):
+    """Escribir una captura con 'flows' flujos TCP/UDP intercalados"""
+    packets = []
+    for i in range(count):
+        flow = i % flows
+        src = f"10.{flow // 250}.{flow % 250}.1"
+        l4 = TCP(sport=20000 + flow, dport=443) if flow % 3 else UDP(dport=9000)
+        packet = Ether() / IP(src=src, dst="192.168.1.10") / l4 / Raw(b"x" * 100)
+        packet.time = 1_700_000_000 + i * 0.0001
+        packets.append(packet)
+    wrpcap(path, packets)
+
+
+def main():
+    if len(sys.argv) > 1:
+        pcap_path = sys.argv[1]
+    else:
+        pcap_path = os.path.join(tempfile.mkdtemp(), "bench_pipeline.pcap")
+        synthetic_pcap(pcap_path)
+
+    print("PIPELINE MULTIPROCESO")
+    print("=" * 40)
+    print(f"CPUs disponibles: {os.cpu_count()}")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        if workers == 0:
+            engine = DetectionEngine()
+            result = replay_pcap(engine, pcap_path)
+        else:
+            result = ShardedPipeline(workers).replay(pcap_path)
+
+        pps = result["packets_per_sec"]
+        baseline = baseline or pps
+        print(
+            f"Trabajadores {workers}: {pps:10,.0f} paquetes/s "
+            f"({pps / baseline:4.2f}x, {result['packets']} paquetes)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Coste de compilación y consulta del índice de prefijos según su tamaño
+Ejecutar: python benchmarks/bench_prefix_index.py [prefijos]
+
+Prefijos IPv4 aleatorios (70 % /32, 20 % /24, 10 % /16) como una lista
+de inteligencia de amenazas. Las consultas van sobre IPs en texto, como
+llegan del parser: "repetidas" usa 10.000 IPs distintas (caché de
+conversión caliente, tráfico real) y "únicas" una IP nueva por consulta.
+"Lote motor" es el camino del motor: IPs en texto de un microlote
+convertidas con ipv4_array y consultadas con contains_many.
+"""
+
+import os
+import random
+import socket
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config.settings import MICRO_BATCH_SIZE
+from network.prefix_index import PrefixIndex, ipv4_array
+
+SIZES = [1_000, 100_000, 1_000_000]
+LOOKUPS = 200_000
+
+
+def random_prefixes(count, rng):
+    prefixes = []
+    for _ in range(count):
+        address = socket.inet_ntoa(struct.pack("!I", rng.getrandbits(32)))
+        roll = rng.random()
+        length = 32 if roll < 0.7 else 24 if roll < 0.9 else 16
+        prefixes.append(f"{address}/{length}")
+    return prefixes
+
+
+def random_ips(count, rng):
+    return [
+        socket.inet_ntoa(struct.pack("!I", rng.getrandbits(32))) for _ in range(count)
+    ]
+
+
+def bench_lookups(index, addresses):
+    """ns por consulta de pertenencia"""
+    start = time.perf_counter()
+    hits = 0
+    for address in addresses:
+        if address in index:
+            hits += 1
+    return (time.perf_counter() - start) / len(addresses) * 1e9, hits
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else SIZES
+    rng = random.Random(7)
+    unique = random_ips(LOOKUPS, rng)
+    repeated = [rng.choice(unique[:10_000]) for _ in range(LOOKUPS)]
+    as_ints = np.array(
+        [struct.unpack("!I", socket.inet_aton(address))[0] for address in unique],
+        dtype=np.uint32,
+    )
+
+    print("ÍNDICE DE PREFIJOS")
+    print("=" * 60)
+    for size in sizes:
+        prefixes = random_prefixes(size, rng)
+        start = time.perf_counter()
+        index = PrefixIndex(prefixes)
+        compile_time = time.perf_counter() - start
+
+        # Primera pasada para calentar la caché de conversión
+        bench_lookups(index, repeated)
+        repeated_ns, _ = bench_lookups(index, repeated)
+        unique_ns, hits = bench_lookups(index, unique)
+
+        start = time.perf_counter()
+        index.contains_many(as_ints)
+        batch_ns = (time.perf_counter() - start) / len(as_ints) * 1e9
+
+        start = time.perf_counter()
+        for offset in range(0, len(unique), MICRO_BATCH_SIZE):
+            index.contains_many(ipv4_array(unique[offset : offset + MICRO_BATCH_SIZE]))
+        engine_ns = (time.perf_counter() - start) / len(unique) * 1e9
+
+        print(f"{size:>9,} prefijos ({len(index):,} rangos tras fusionar)")
+        print(f"  Compilación:        {compile_time:8.2f} s")
+        print(f"  Consulta repetidas: {repeated_ns:8.0f} ns")
+        print(f"  Consulta únicas:    {unique_ns:8.0f} ns ({hits} aciertos)")
+        print(f"  Lote NumPy:         {batch_ns:8.1f} ns/IP")
+        print(f"  Lote motor (texto): {engine_ns:8.1f} ns/IP")
+
+
+if __name__ == "__main__":
+    main()
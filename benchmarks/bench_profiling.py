@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Coste de la instrumentación por etapas sobre el motor
+Ejecutar: python benchmarks/bench_profiling.py [captura.pcap]
+
+Procesa las mismas tramas en memoria con el perfilado desactivado y
+activado, alternando varias rondas para reducir el ruido de la máquina.
+Cada pasada corre en un proceso hijo: la memoria que deja una pasada no
+penaliza a la siguiente (con pasadas en el mismo proceso el orden pesaba
+más que la instrumentación).
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import Ether, IP, TCP, UDP, Raw
+
+from network.engine import DetectionEngine
+from network.profiling import format_profile
+from network.replay import read_raw_frames
+
+ROUNDS = 5
+
+
+def synthetic_frames(count=50000, flows=2000):
+    """Tramas TCP/UDP de 'flows' flujos intercalados"""
+    frames = []
+    for i in range(count):
+        flow = i % flows
+        l4 = TCP(sport=20000 + flow, dport=443) if flow % 3 else UDP(dport=9000)
+        packet = Ether() / IP(src=f"10.0.{flow % 250}.1", dst="10.1.0.1") / l4
+        frames.append((bytes(packet / Raw(b"x" * 100)), i * 0.0001, 1))
+    return frames
+
+
+def run(frames, profiling, queue):
+    """Procesar todas las tramas y enviar (paquetes/s, resumen del perfil)"""
+    engine = DetectionEngine(packet_filter="", profiling=profiling)
+    engine.start_time = frames[0][1]
+    start = time.perf_counter()
+    for frame, capture_time, linktype in frames:
+        engine.process_frame(frame, capture_time, linktype)
+    engine.batcher.flush()
+    rate = len(frames) / (time.perf_counter() - start)
+    queue.put((rate, engine.profile_snapshot() if profiling else None))
+
+
+def run_child(context, frames, profiling):
+    queue = context.Queue()
+    process = context.Process(target=run, args=(frames, profiling, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = list(read_raw_frames(sys.argv[1]))
+    else:
+        frames = synthetic_frames()
+    context = multiprocessing.get_context("fork")
+
+    rates = {False: [], True: []}
+    snapshot = None
+    for _ in range(ROUNDS):
+        for profiling in (False, True):
+            rate, profile = run_child(context, frames, profiling)
+            rates[profiling].append(rate)
+            snapshot = profile or snapshot
+
+    best_off = max(rates[False])
+    best_on = max(rates[True])
+    print("COSTE DEL PERFILADO")
+    print("=" * 60)
+    print(f"Desactivado: {best_off:10,.0f} paquetes/s (mejor de {ROUNDS})")
+    print(f"Activado:    {best_on:10,.0f} paquetes/s (mejor de {ROUNDS})")
+    print(f"Sobrecoste:  {(best_off / best_on - 1) * 100:9.2f} %")
+    print()
+    print(format_profile(snapshot))
+
+
+if __name__ == "__main__":
+    main()
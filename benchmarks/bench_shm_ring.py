@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Anillo de memoria compartida frente a multiprocessing.Queue
+Ejecutar: python benchmarks/bench_shm_ring.py [registros]
+
+Un proceso hijo produce los registros y el padre los consume. Se mide:
+- Queue con un put() por registro (tupla de campos, serializada)
+- Queue con lotes de tuplas
+- Anillo empaquetando/desempaquetando tuplas (extremo a extremo)
+- Anillo con arrays ya empaquetados (solo transporte)
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.shm_ring import SharedRing, pack_fields, to_array, unpack_fields
+
+BATCH = 512
+
+
+def make_fields(count):
+    """Campos de paquete variados (IPv4 e IPv6)"""
+    fields = []
+    for i in range(count):
+        if i % 10 == 0:
+            src, dst = "2001:db8::1", f"2001:db8::{i % 4096:x}"
+        else:
+            src, dst = f"10.0.{i % 256}.{i % 200}", "192.168.1.10"
+        fields.append(
+            (i, i * 1e-6, (src, dst, 6, 40000 + i % 1000, 443, 60 + i % 1400))
+        )
+    return fields
+
+
+def queue_per_record(queue, fields):
+    for item in fields:
+        queue.put(item)
+    queue.put(None)
+
+
+def queue_batched(queue, fields):
+    for start in range(0, len(fields), BATCH):
+        queue.put(fields[start : start + BATCH])
+    queue.put(None)
+
+
+def ring_records(ring, fields):
+    for start in range(0, len(fields), BATCH):
+        ring.put(
+            to_array([pack_fields(*item) for item in fields[start : start + BATCH]])
+        )
+    ring.finish()
+
+
+def ring_raw(ring, array):
+    for start in range(0, len(array), BATCH):
+        ring.put(array[start : start + BATCH])
+    ring.finish()
+
+
+def consume_queue(queue, batched):
+    received = 0
+    while True:
+        item = queue.get()
+        if item is None:
+            return received
+        received += len(item) if batched else 1
+
+
+def consume_ring(ring, unpack):
+    received = 0
+    while True:
+        array = ring.get()
+        if array is None:
+            return received
+        received += len(unpack_fields(array)) if unpack else len(array)
+
+
+def timed(producer, payload, transport, consume):
+    """Lanzar el productor en otro proceso y consumir hasta el final"""
+    process = mp.Process(target=producer, args=(transport, payload))
+    start = time.perf_counter()
+    process.start()
+    received = consume()
+    elapsed = time.perf_counter() - start
+    process.join()
+    return received, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    fields = make_fields(count)
+    packed = to_array([pack_fields(*item) for item in fields])
+
+    results = []
+    queue = mp.Queue()
+    results.append(
+        ("Queue, 1 registro/put",)
+        + timed(queue_per_record, fields, queue, lambda: consume_queue(queue, False))
+    )
+    results.append(
+        (f"Queue, lotes de {BATCH}",)
+        + timed(queue_batched, fields, queue, lambda: consume_queue(queue, True))
+    )
+
+    ring = SharedRing()
+    results.append(
+        ("Anillo, tuplas empaquetadas",)
+        + timed(ring_records, fields, ring, lambda: consume_ring(ring, True))
+    )
+    ring.close()
+    ring.unlink()
+
+    ring = SharedRing()
+    results.append(
+        ("Anillo, solo transporte",)
+        + timed(ring_raw, packed, ring, lambda: consume_ring(ring, False))
+    )
+    ring.close()
+    ring.unlink()
+
+    print("TRANSPORTE ENTRE PROCESOS")
+    print("=" * 60)
+    print(f"Registros: {count:,}, CPUs: {os.cpu_count()}")
+    for name, received, elapsed in results:
+        print(
+            f"{name:30s} {received / elapsed:12,.0f} reg/s "
+            f"({elapsed * 1e9 / received:7.0f} ns/reg)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks del camino captura -> clasificación (sin NIC ni Qt)
+Ejecutar: python benchmarks/suite.py [--save baseline.json] [--compare baseline.json]
+
+Cada escenario genera tráfico sintético reproducible (semilla fija) y lo
+pasa por FlowTracker, SimplePacketClassifier y KMeansClassifier en lotes
+de MICRO_BATCH_SIZE, como hace el motor. El modo "nsl_kdd" clasifica los
+vectores derivados de NSL_KDD_test.txt con el mismo mapeo que el script
+de entrenamiento. Cada escenario corre en un proceso hijo para medir su
+pico de memoria (RSS) por separado.
+
+Con --save se guardan los resultados como referencia; con --compare se
+comparan contra una referencia y el proceso sale con código 1 si algún
+escenario empeora más que la tolerancia.
+"""
+
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from config.settings import CLEANUP_INTERVAL, MICRO_BATCH_SIZE
+from models.model_loader import ModelLoader
+from models.packet_classifier import KMeansClassifier, SimplePacketClassifier
+from network.flow_tracker import FlowTracker
+from network.profiling import LatencyHistogram
+
+NSL_KDD_PATH = "NSL_KDD_test.txt"
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.15
+
+# Protocolos como número IP, igual que PacketRecord.protocol
+TCP = 6
+UDP = 17
+
+# Métricas comparadas: (nombre, True si más alto es mejor)
+METRICS = [
+    ("packets_per_sec", True),
+    ("p99_us", False),
+    ("peak_rss_kb", False),
+]
+
+
+# ---------------------------------------------------------------------------
+# Generadores de tráfico: (src_ip, dst_ip, src_port, dst_port, proto, tamaño, t)
+# ---------------------------------------------------------------------------
+
+
+def short_flows(count, seed=1):
+    """Muchos flujos cortos (2-10 paquetes) tipo web/DNS, intercalados"""
+    rng = random.Random(seed)
+    timestamp = 0.0
+    active = []
+    emitted = 0
+    while emitted < count:
+        if len(active) < 500:
+            client = (
+                f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+            )
+            protocol = UDP if rng.random() < 0.3 else TCP
+            server_port = 53 if protocol == UDP else rng.choice((80, 443))
+            remaining = rng.randint(2, 10)
+            active.append(
+                [client, rng.randrange(32768, 61000), server_port, protocol, remaining]
+            )
+        flow = active[rng.randrange(len(active))]
+        client, client_port, server_port, protocol, remaining = flow
+        timestamp += 0.00002
+        if remaining % 2:
+            yield (
+                "192.168.1.10",
+                client,
+                server_port,
+                client_port,
+                protocol,
+                rng.randint(200, 1500),
+                timestamp,
+            )
+        else:
+            yield (
+                client,
+                "192.168.1.10",
+                client_port,
+                server_port,
+                protocol,
+                rng.randint(60, 300),
+                timestamp,
+            )
+        emitted += 1
+        flow[4] -= 1
+        if not flow[4]:
+            active.remove(flow)
+
+
+def elephant_flows(count, seed=2, flows=8):
+    """Pocos flujos muy largos (transferencias masivas)"""
+    rng = random.Random(seed)
+    timestamp = 0.0
+    for i in range(count):
+        flow = rng.randrange(flows)
+        timestamp += 0.00001
+        if i % 4:
+            yield (
+                "10.0.0.1",
+                f"10.0.1.{flow}",
+                45000 + flow,
+                443,
+                TCP,
+                1500,
+                timestamp,
+            )
+        else:
+            yield (
+                f"10.0.1.{flow}",
+                "10.0.0.1",
+                443,
+                45000 + flow,
+                TCP,
+                66,
+                timestamp,
+            )
+
+
+def syn_flood(count, seed=3):
+    """Un destino, orígenes y puertos aleatorios: un paquete por flujo"""
+    rng = random.Random(seed)
+    timestamp = 0.0
+    for _ in range(count):
+        timestamp += 0.000005
+        source = f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+        yield (
+            source,
+            "192.168.1.10",
+            rng.randrange(1024, 65536),
+            80,
+            TCP,
+            60,
+            timestamp,
+        )
+
+
+def port_scan(count, seed=4):
+    """Un origen barriendo puertos de varios hosts (un flujo por puerto)"""
+    rng = random.Random(seed)
+    timestamp = 0.0
+    for i in range(count):
+        timestamp += 0.00002
+        target = f"192.168.1.{1 + (i // 65535) % 254}"
+        protocol = UDP if i % 10 == 0 else TCP
+        yield (
+            "172.16.0.99",
+            target,
+            rng.randrange(40000, 60000),
+            1 + i % 65535,
+            protocol,
+            60,
+            timestamp,
+        )
+
+
+GENERATORS = {
+    "short_flows": short_flows,
+    "elephant_flows": elephant_flows,
+    "syn_flood": syn_flood,
+    "port_scan": port_scan,
+}
+
+
+# ---------------------------------------------------------------------------
+# Escenarios
+# ---------------------------------------------------------------------------
+
+
+def run_traffic(generator, count, kmeans):
+    """Pasar el tráfico por tracker + heurística + K-Means en lotes"""
+    packets = list(GENERATORS[generator](count))
+    tracker = FlowTracker()
+    heuristic = SimplePacketClassifier()
+    packet_latency = LatencyHistogram()
+    batch_latency = LatencyHistogram()
+    clock = time.perf_counter_ns
+
+    pending = []
+    anomalous = 0
+    last_cleanup = packets[0][6]
+    start = time.perf_counter()
+    for src_ip, dst_ip, src_port, dst_port, protocol, size, timestamp in packets:
+        begin = clock()
+        flow_key = tracker.add_packet(
+            src_ip, dst_ip, src_port, dst_port, protocol, size, timestamp
+        )
+        pending.append(tracker.calculate_flow_features(flow_key))
+        heuristic.classify_single_packet(size, src_port, dst_port, protocol)
+        packet_latency.record(clock() - begin)
+
+        if len(pending) >= MICRO_BATCH_SIZE:
+            anomalous += classify(kmeans, pending, batch_latency)
+            pending = []
+        if timestamp - last_cleanup >= CLEANUP_INTERVAL:
+            last_cleanup = timestamp
+            tracker.cleanup_old_flows(timestamp)
+    if pending:
+        anomalous += classify(kmeans, pending, batch_latency)
+    elapsed = time.perf_counter() - start
+
+    return summarize(count, elapsed, packet_latency, batch_latency, anomalous)
+
+
+def run_nsl_kdd(count, kmeans):
+    """Clasificar vectores derivados de NSL-KDD; count=0 usa todo el archivo"""
+    features, labels = load_nsl_kdd(NSL_KDD_PATH, count)
+    batch_latency = LatencyHistogram()
+    predictions = []
+
+    start = time.perf_counter()
+    for offset in range(0, len(features), MICRO_BATCH_SIZE):
+        begin = time.perf_counter_ns()
+        results = kmeans.classify_batch(features[offset : offset + MICRO_BATCH_SIZE])
+        batch_latency.record(time.perf_counter_ns() - begin)
+        predictions.extend(label for label, _ in results)
+    elapsed = time.perf_counter() - start
+
+    anomalous = sum(label != "Normal" for label in predictions)
+    result = summarize(len(features), elapsed, batch_latency, batch_latency, anomalous)
+    # Tasa de detección frente a la etiqueta real (control de regresión funcional)
+    attacks = [pred for pred, label in zip(predictions, labels) if label != "normal"]
+    result["detection_rate"] = (
+        sum(pred != "Normal" for pred in attacks) / len(attacks) if attacks else 0.0
+    )
+    return result
+
+
+def classify(kmeans, pending, histogram):
+    """Clasificar un lote; devuelve cuántos resultaron anómalos"""
+    begin = time.perf_counter_ns()
+    results = kmeans.classify_batch(pending)
+    histogram.record(time.perf_counter_ns() - begin)
+    return sum(label != "Normal" for label, _ in results)
+
+
+def summarize(count, elapsed, latency, batch_latency, anomalous):
+    return {
+        "packets": count,
+        "seconds": elapsed,
+        "packets_per_sec": count / elapsed,
+        "p50_us": latency.percentile(50) / 1000,
+        "p99_us": latency.percentile(99) / 1000,
+        "batch_p99_us": batch_latency.percentile(99) / 1000,
+        "anomalous_ratio": anomalous / max(count, 1),
+    }
+
+
+def load_nsl_kdd(path, limit=0):
+    """Vectores de 8 características con el mapeo de modeloK-means.py"""
+    features = []
+    labels = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.reader(handle):
+            if limit and len(features) >= limit:
+                break
+            duration = float(row[0])
+            src_bytes = float(row[4])
+            dst_bytes = float(row[5])
+            count = float(row[22])
+            features.append(
+                [
+                    duration,
+                    count,
+                    float(row[23]),  # srv_count
+                    float(row[24]),  # serror_rate
+                    float(row[26]),  # rerror_rate
+                    src_bytes / count if count > 0 else src_bytes,
+                    math.log1p(dst_bytes),
+                    count / (duration + 0.001) if duration > 0 else count * 1000,
+                ]
+            )
+            labels.append(row[41])
+    return features, labels
+
+
+def run_scenario(name, count, kmeans, queue):
+    """Ejecutar un escenario (en el proceso hijo) y enviar el resultado"""
+    if name == "nsl_kdd":
+        result = run_nsl_kdd(count, kmeans)
+    else:
+        result = run_traffic(name, count, kmeans)
+    # ru_maxrss está en KiB en Linux
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put(result)
+
+
+# ---------------------------------------------------------------------------
+# Referencia JSON
+# ---------------------------------------------------------------------------
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lista de regresiones (escenario, métrica, referencia, actual)"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["scenarios"].get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in METRICS:
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (higher_is_better and change < -tolerance) or (
+                not higher_is_better and change > tolerance
+            ):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del pipeline")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=list(GENERATORS) + ["nsl_kdd"],
+        choices=list(GENERATORS) + ["nsl_kdd"],
+    )
+    parser.add_argument(
+        "--packets", type=int, default=100000, help="Paquetes por escenario"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=3, help="Rondas por escenario (se toma la mejor)"
+    )
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, default=None)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Empeoramiento relativo permitido (0.15 = 15 %%)",
+    )
+    args = parser.parse_args()
+
+    # El modelo se carga una vez; los hijos lo heredan con fork
+    loader = ModelLoader()
+    kmeans = KMeansClassifier(loader.get_model(), loader.get_scaler())
+    context = multiprocessing.get_context("fork")
+
+    print("SUITE DE BENCHMARKS")
+    print("=" * 78)
+    print(
+        f"{'Escenario':<16}{'paquetes/s':>12}{'p50 us':>9}{'p99 us':>9}"
+        f"{'lote p99':>10}{'anómalos':>10}{'RSS MiB':>10}"
+    )
+    results = {}
+    for name in args.scenarios:
+        # NSL-KDD usa el archivo completo salvo que se limite
+        count = 0 if name == "nsl_kdd" else args.packets
+        best = None
+        for _ in range(args.rounds):
+            queue = context.Queue()
+            process = context.Process(
+                target=run_scenario, args=(name, count, kmeans, queue)
+            )
+            process.start()
+            result = queue.get()
+            process.join()
+            if best is None or result["packets_per_sec"] > best["packets_per_sec"]:
+                best = result
+        results[name] = best
+        print(
+            f"{name:<16}{best['packets_per_sec']:>12,.0f}{best['p50_us']:>9.1f}"
+            f"{best['p99_us']:>9.1f}{best['batch_p99_us']:>10.1f}"
+            f"{best['anomalous_ratio']:>10.1%}{best['peak_rss_kb'] / 1024:>10.1f}"
+        )
+    if "nsl_kdd" in results:
+        print(f"Detección NSL-KDD: {results['nsl_kdd']['detection_rate']:.1%}")
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.tolerance)
+        print()
+        if regressions:
+            exit_code = 1
+            for name, metric, old, new in regressions:
+                print(f"[ERROR] {name}.{metric}: {old:,.1f} -> {new:,.1f}")
+        else:
+            print(f"[OK] Sin regresiones frente a {args.compare}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"environment": environment(), "scenarios": results}, handle, indent=2
+            )
+        print(f"[OK] Referencia guardada en: {args.save}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,5 @@
 """Mapeo de clusters y colores"""
 
-from PyQt5.QtCore import Qt
-
 # Mapeo de clusters a categorías
 CLUSTER_MAPPING = {
     0: "Anómalo",
@@ -9,5 +7,5 @@ CLUSTER_MAPPING = {
     2: "Anómalo",
 }
 
-# Colores para la interfaz
-CLUSTER_COLORS = {"Anómalo": (Qt.red, Qt.white), "Normal": (Qt.green, Qt.white)}
+# Colores para la interfaz (nombres de color Qt: fondo, texto)
+CLUSTER_COLORS = {"Anómalo": ("red", "white"), "Normal": ("green", "white")}
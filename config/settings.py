@@ -3,17 +3,87 @@
 # Configuración del modelo
 MODEL_PATH = "kmeans_model_improved.pkl"
 SCALER_PATH = "scaler_kmeans_improved.pkl"
+KERNEL_PATH = "kmeans_kernel.npz"  # Kernel NumPy exportado (sin scikit-learn)
 
 # Configuración de flujos
 FLOW_TIMEOUT = 60
 MAX_PACKETS_PER_TABLE = 1000
-CLEANUP_INTERVAL = 100
+CLEANUP_INTERVAL = 1.0  # Segundos entre barridos de flujos expirados
+FLOW_HISTORY_SIZE = 0  # Paquetes recientes guardados por flujo (0 = desactivado)
+
+# Configuración de clasificación por lotes
+MICRO_BATCH_SIZE = 256
+MICRO_BATCH_MAX_DELAY = 0.005  # segundos
+
+# Caché de veredictos por flujo (ver DetectionEngine._cached_verdict)
+VERDICT_CACHE_ENABLED = True
+VERDICT_CHECKPOINT_FACTOR = 2  # Reclasificar al multiplicar los paquetes del flujo
+VERDICT_DRIFT_THRESHOLD = 0.25  # Cambio relativo de tamaño o IAT medio que reclasifica
+
+# Puntuaciones de riesgo por puerto de la heurística (ver models/packet_classifier.py)
+PORT_RISK_PATH = "config/port_risk.txt"
+
+# Configuración del pipeline multiproceso
+PIPELINE_WORKERS = 0  # 0 = todo en un proceso (DetectionEngine)
+PIPELINE_BATCH_SIZE = 512  # Paquetes por envío a cada trabajador
+PIPELINE_FLUSH_INTERVAL = 0.005  # segundos máximos de espera de un lote incompleto
+SHM_RING_CAPACITY = 65536  # Registros por anillo de memoria compartida
+SHM_RING_POLL_INTERVAL = 0.0005  # segundos de espera con el anillo vacío/lleno
+
+# Descarte de carga bajo sobrecarga (ver network/load_shedder.py)
+LOAD_SHED_MODE = "adaptive"  # "off", "fixed" (1 de cada N flujos) o "adaptive"
+LOAD_SHED_SAMPLE_RATE = 1  # N inicial (se redondea a potencia de 2)
+LOAD_SHED_MAX_RATE = 64  # N máximo en modo adaptativo
+LOAD_SHED_TARGET_LAG = 0.25  # segundos de retraso de captura tolerados
+LOAD_SHED_ADAPT_INTERVAL = 1.0  # segundos entre ajustes de N
+
+# Instrumentación por etapas (ver network/profiling.py)
+PROFILING_ENABLED = False  # Desactivado no añade ningún coste
+PROFILING_WINDOW = 256  # Máximo de llamadas cronometradas por etapa e intervalo
+
+# Exportador de métricas Prometheus (ver network/metrics.py)
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"  # Solo local por defecto
+METRICS_PORT = 9464
+
+# Almacén persistente de flujos y alertas (ver network/flow_store.py)
+STORE_ENABLED = False
+STORE_PATH = "data/store"
+STORE_FLUSH_INTERVAL = 5.0  # segundos máximos entre escrituras
+STORE_BATCH_SIZE = 4096  # filas pendientes que adelantan la escritura
+STORE_PARTITION_SECONDS = 3600  # Duración de cada partición (fija al crear)
+
+# Exportación a CSV/JSONL (ver network/export.py)
+EXPORT_CHUNK_SIZE = 10000  # Filas por bloque entre avisos de progreso
+
+# Listas de prefijos IP/CIDR consultadas antes de K-Means (ver network/prefix_index.py)
+ALLOWLIST_PATH = "config/allowlist.txt"  # Nunca se marcan como anómalos
+WATCHLIST_PATH = "config/watchlist.txt"  # Cualquier contacto es anómalo
+PREFIX_RELOAD_INTERVAL = 5.0  # segundos entre comprobaciones de cambios
+PREFIX_CACHE_SIZE = 65536  # IPs con resultado memorizado por lista
 
 # Configuración de red
-PACKET_FILTER = "ip"
+PACKET_FILTER = "ip"  # Expresión BPF o nombre de CAPTURE_FILTER_SETS
+CAPTURE_FILTER_SETS = {
+    "ip": "ip",
+    "ip-ip6": "ip or ip6",
+    "tcp-udp": "(ip or ip6) and (tcp or udp)",
+}
+CAPTURE_EXCLUDE_NETS = []  # Subredes de confianza descartadas en el kernel
+CAPTURE_EXCLUDE_PORTS = []  # Puertos de tráfico masivo conocido (p. ej. backups)
+CAPTURE_SNAPLEN = 128  # Bytes copiados por trama (cabeceras); 0 = trama completa
+CAPTURE_BUFFER_SIZE = 8 * 1024 * 1024  # SO_RCVBUF del socket (0 = por defecto)
+CAPTURE_STATS_INTERVAL = 1.0  # segundos entre lecturas de descartes del kernel
+CAPTURE_BACKEND = "socket"  # "socket" (recv por trama) o "mmap" (TPACKET_V3, Linux)
+MMAP_BLOCK_SIZE = (
+    1 << 20
+)  # bytes por bloque del anillo (el total es CAPTURE_BUFFER_SIZE)
+MMAP_BLOCK_TIMEOUT = 10  # ms hasta entregar un bloque aunque no esté lleno
 SNIFF_TIMEOUT = None
 
 # Configuración de GUI
 WINDOW_TITLE = "Sistema de Detección de Anomalías en Red - K-Means (2 Categorías)"
 WINDOW_SIZE = (1400, 800)
 STATS_UPDATE_INTERVAL = 1000  # ms
+GUI_REFRESH_INTERVAL = 33  # ms (~30 Hz) entre lotes de paquetes hacia la tabla
+GUI_MAX_ROWS_PER_FRAME = 500  # Filas mostradas por refresco; el resto se muestrea
@@ -0,0 +1,62 @@
+"""
+Exportación en segundo plano con diálogo de progreso
+Archivo: gui/components/export_worker.py
+"""
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+
+
+class ExportWorker(QThread):
+    """Ejecuta job(progress, cancelled) fuera del hilo de la GUI"""
+
+    progress = pyqtSignal(int)  # Porcentaje completado
+    completed = pyqtSignal(int)  # Filas escritas
+    failed = pyqtSignal(str)
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            written = self.job(
+                lambda fraction: self.progress.emit(int(fraction * 100)),
+                lambda: self._cancelled,
+            )
+            self.completed.emit(written)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+def start_export(parent, job, path):
+    """Lanzar la exportación mostrando progreso; la GUI sigue respondiendo"""
+    dialog = QProgressDialog(f"Exportando a {path}...", "Cancelar", 0, 100, parent)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(500)
+
+    worker = ExportWorker(job)
+    worker.progress.connect(dialog.setValue)
+    dialog.canceled.connect(worker.cancel)
+
+    def on_completed(written):
+        dialog.reset()
+        if not worker._cancelled:
+            print(f"[OK] {written} filas exportadas a: {path}")
+
+    def on_failed(message):
+        dialog.reset()
+        print(f"[ERROR] Error exportando: {message}")
+        QMessageBox.warning(parent, "Exportar", f"Error exportando: {message}")
+
+    worker.completed.connect(on_completed)
+    worker.failed.connect(on_failed)
+    # Mantener referencias vivas mientras dure la exportación
+    parent._export_worker = worker
+    parent._export_dialog = dialog
+    worker.start()
+    return worker
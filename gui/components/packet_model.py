@@ -0,0 +1,207 @@
+"""
+Modelo de tabla virtualizado sobre un buffer circular de paquetes
+Archivo: gui/components/packet_model.py
+"""
+
+from bisect import bisect_left
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor
+
+from config.cluster_mapping import CLUSTER_COLORS
+from network.packet_record import Classification
+
+COLUMN_HEADERS = [
+    "No.",
+    "Tiempo",
+    "IP Origen",
+    "IP Destino",
+    "Protocolo",
+    "Tamaño",
+    "Info",
+    "Clasificación",
+]
+CLASSIFICATION_COLUMN = 7
+
+# Texto de cada columna, generado solo para las celdas visibles
+COLUMN_TEXT = [
+    lambda r: str(r.number),
+    lambda r: str(r.timestamp),
+    lambda r: r.src_ip,
+    lambda r: r.dst_ip,
+    lambda r: r.protocol_name,
+    lambda r: str(r.length),
+    lambda r: r.info_text(),
+    lambda r: r.classification_text(),
+]
+
+# Colores de la columna de clasificación (fondo, texto) por enum
+CLASSIFICATION_BRUSHES = {
+    classification: tuple(
+        QBrush(QColor(color)) for color in CLUSTER_COLORS[classification.label]
+    )
+    for classification in Classification
+}
+
+
+class PacketRingBuffer:
+    """Buffer circular de capacidad fija con índice de paquetes anómalos
+
+    Cada paquete recibe un número de secuencia creciente; el buffer guarda
+    los de [start_seq, end_seq). El índice de anómalos es una lista ordenada
+    de secuencias, así la vista de anómalos no duplica los registros.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self.records = [None] * self.capacity
+        self.start_seq = 0
+        self.end_seq = 0
+        self.anomalies = []
+        self.anomaly_head = 0
+
+    def __len__(self):
+        return self.end_seq - self.start_seq
+
+    def anomaly_count(self):
+        return len(self.anomalies) - self.anomaly_head
+
+    def get(self, row):
+        """Registro en la fila 'row' de la vista completa"""
+        return self.records[(self.start_seq + row) % self.capacity]
+
+    def get_anomaly(self, row):
+        """Registro en la fila 'row' de la vista de anómalos"""
+        seq = self.anomalies[self.anomaly_head + row]
+        return self.records[seq % self.capacity]
+
+    def anomalies_before(self, seq):
+        """Cantidad de anómalos con secuencia menor a 'seq'"""
+        return bisect_left(self.anomalies, seq, self.anomaly_head) - self.anomaly_head
+
+    def evict(self, count):
+        """Descartar los 'count' registros más antiguos en O(count)"""
+        for seq in range(self.start_seq, self.start_seq + count):
+            self.records[seq % self.capacity] = None
+        self.start_seq += count
+        self.anomaly_head += self.anomalies_before(self.start_seq)
+
+        # Compactar el índice cuando la parte descartada domina
+        if self.anomaly_head > 1024 and self.anomaly_head * 2 > len(self.anomalies):
+            del self.anomalies[: self.anomaly_head]
+            self.anomaly_head = 0
+
+    def append(self, records):
+        """Agregar registros (debe haber espacio: usar evict antes)"""
+        for record in records:
+            seq = self.end_seq
+            self.records[seq % self.capacity] = record
+            if record.classification == Classification.ANOMALO:
+                self.anomalies.append(seq)
+            self.end_seq = seq + 1
+
+
+class PacketTableModel(QAbstractTableModel):
+    """Vista de solo lectura sobre el buffer (todos o solo anómalos)"""
+
+    def __init__(self, buffer, anomalies_only=False):
+        super().__init__()
+        self.buffer = buffer
+        self.anomalies_only = anomalies_only
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.anomalies_only:
+            return self.buffer.anomaly_count()
+        return len(self.buffer)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def record_at(self, row):
+        if self.anomalies_only:
+            return self.buffer.get_anomaly(row)
+        return self.buffer.get(row)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return COLUMN_TEXT[column](self.record_at(index.row()))
+
+        # Colorear la columna de clasificación según el enum
+        if column == CLASSIFICATION_COLUMN:
+            if role == Qt.BackgroundRole:
+                return CLASSIFICATION_BRUSHES[
+                    self.record_at(index.row()).classification
+                ][0]
+            if role == Qt.ForegroundRole:
+                return CLASSIFICATION_BRUSHES[
+                    self.record_at(index.row()).classification
+                ][1]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return str(section + 1)
+
+
+class PacketStore:
+    """Buffer compartido y sus dos modelos, con notificaciones O(lote)"""
+
+    def __init__(self, capacity):
+        self.buffer = PacketRingBuffer(capacity)
+        self.all_model = PacketTableModel(self.buffer)
+        self.anomaly_model = PacketTableModel(self.buffer, anomalies_only=True)
+
+    def add_records(self, records):
+        """Agregar un lote de registros desalojando los más antiguos"""
+        if not records:
+            return
+        buffer = self.buffer
+        records = records[-buffer.capacity :]
+        root = QModelIndex()
+
+        # Desalojar primero lo que no cabe
+        overflow = len(buffer) + len(records) - buffer.capacity
+        if overflow > 0:
+            evicted_anomalies = buffer.anomalies_before(buffer.start_seq + overflow)
+            self.all_model.beginRemoveRows(root, 0, overflow - 1)
+            if evicted_anomalies:
+                self.anomaly_model.beginRemoveRows(root, 0, evicted_anomalies - 1)
+            buffer.evict(overflow)
+            self.all_model.endRemoveRows()
+            if evicted_anomalies:
+                self.anomaly_model.endRemoveRows()
+
+        # Insertar al final
+        first_row = len(buffer)
+        first_anomaly_row = buffer.anomaly_count()
+        new_anomalies = sum(
+            1 for r in records if r.classification == Classification.ANOMALO
+        )
+        self.all_model.beginInsertRows(root, first_row, first_row + len(records) - 1)
+        if new_anomalies:
+            self.anomaly_model.beginInsertRows(
+                root, first_anomaly_row, first_anomaly_row + new_anomalies - 1
+            )
+        buffer.append(records)
+        self.all_model.endInsertRows()
+        if new_anomalies:
+            self.anomaly_model.endInsertRows()
+
+    def clear(self):
+        self.all_model.beginResetModel()
+        self.anomaly_model.beginResetModel()
+        self.buffer.clear()
+        self.all_model.endResetModel()
+        self.anomaly_model.endResetModel()
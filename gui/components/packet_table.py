@@ -9,16 +9,29 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QStackedWidget,
     QHeaderView,
+    QFileDialog,
+    QInputDialog,
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
 
-from config.cluster_mapping import CLUSTER_COLORS
-from config.settings import MAX_PACKETS_PER_TABLE
+from config.settings import MAX_PACKETS_PER_TABLE, GUI_MAX_ROWS_PER_FRAME
+from gui.components.packet_model import PacketStore
+from gui.components.export_worker import start_export
+from network.export import export_records, export_store
+
+EXPORT_FILTERS = (
+    "CSV (*.csv);;JSON Lines (*.jsonl);;"
+    "CSV gzip (*.csv.gz);;JSON Lines gzip (*.jsonl.gz)"
+)
+EXPORT_SOURCES = {
+    "Vista actual": None,
+    "Flujos finalizados (almacén)": "flows",
+    "Alertas (almacén)": "alerts",
+}
 
 
 class PacketTableManager(QWidget):
@@ -35,9 +48,16 @@ class PacketTableManager(QWidget):
     def setup_data(self):
         """Inicializar datos del gestor"""
         self.total_packets = 0
+        self.sampled_out_packets = 0
         self.classification_counts = {"Normal": 0, "Anómalo": 0}
         self.current_view = "all"  # "all" o "anomalous"
 
+        # Buffer circular compartido por ambas vistas (anómalos = índice filtrado)
+        self.packet_store = PacketStore(MAX_PACKETS_PER_TABLE)
+        self._scroll_pending = False
+        # Almacén persistente (FlowStore) si está activo; lo asigna MainWindow
+        self.flow_store = None
+
     def setup_ui(self):
         """Configurar interfaz de usuario"""
         layout = QVBoxLayout(self)
@@ -56,14 +76,21 @@ class PacketTableManager(QWidget):
         self.control_btn.clicked.connect(self.toggle_capture)
         self.header_layout.addWidget(self.control_btn)
 
+        self.export_btn = QPushButton("Exportar")
+        self.export_btn.setMaximumWidth(100)
+        self.export_btn.clicked.connect(self.export_current_view)
+        self.header_layout.addWidget(self.export_btn)
+
         layout.addLayout(self.header_layout)
 
         # Widget apilado para alternar entre tablas
         self.stacked_widget = QStackedWidget()
 
         # Crear las dos tablas
-        self.all_packets_table = self.create_table_widget()
-        self.anomaly_packets_table = self.create_table_widget()
+        self.all_packets_table = self.create_table_widget(self.packet_store.all_model)
+        self.anomaly_packets_table = self.create_table_widget(
+            self.packet_store.anomaly_model
+        )
 
         # Agregar al stack
         self.stacked_widget.addWidget(self.all_packets_table)
@@ -75,21 +102,10 @@ class PacketTableManager(QWidget):
         self.active_table = self.all_packets_table
         self.stacked_widget.setCurrentIndex(0)
 
-    def create_table_widget(self):
-        """Crear widget de tabla con configuración estándar"""
-        table = QTableWidget(0, 8)
-        table.setHorizontalHeaderLabels(
-            [
-                "No.",
-                "Tiempo",
-                "IP Origen",
-                "IP Destino",
-                "Protocolo",
-                "Tamaño",
-                "Info",
-                "Clasificación",
-            ]
-        )
+    def create_table_widget(self, model):
+        """Crear vista de tabla con configuración estándar"""
+        table = QTableView()
+        table.setModel(model)
 
         # Configurar encabezados
         header = table.horizontalHeader()
@@ -101,12 +117,16 @@ class PacketTableManager(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)  # Tamaño
         header.setSectionResizeMode(6, QHeaderView.Stretch)  # Info
         header.setSectionResizeMode(7, QHeaderView.ResizeToContents)  # Clasificación
+        header.setResizeContentsPrecision(0)  # Medir solo las filas visibles
+
+        # Altura de fila fija: la vista no mide filas fuera de pantalla
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
         # Estilos
         table.setAlternatingRowColors(True)
         table.setStyleSheet(
             """
-            QTableWidget {
+            QTableView {
                 font-size: 11px;
                 background-color: white;
                 alternate-background-color: #f9f9f9;
@@ -148,63 +168,55 @@ class PacketTableManager(QWidget):
         # Emitir estadísticas actualizadas
         self.emit_stats()
 
-    def add_packet(self, packet_data):
-        """Agregar paquete a las tablas correspondientes"""
-        # Determinar si es anómalo
-        classification_str = str(packet_data[7])  # Columna de clasificación
-        is_anomalous = (
-            "Anómalo" in classification_str or "ANOMALO" in classification_str.upper()
-        )
+    def add_packet(self, record):
+        """Agregar paquete (PacketRecord) a las tablas correspondientes"""
+        self.add_packets([record])
+
+    def add_packets(self, records):
+        """Agregar un lote de paquetes al buffer compartido"""
+        # Contadores exactos sobre el lote completo
+        anomalous = sum(1 for record in records if record.is_anomalous)
+        self.classification_counts["Anómalo"] += anomalous
+        self.classification_counts["Normal"] += len(records) - anomalous
+        self.total_packets += len(records)
 
-        # Siempre agregar a la tabla de todos los paquetes
-        self.add_packet_to_table(self.all_packets_table, packet_data)
+        # Si llegan más filas de las que la vista puede mostrar, muestrear
+        shown = self.sample_rows(records, GUI_MAX_ROWS_PER_FRAME)
+        self.sampled_out_packets += len(records) - len(shown)
 
-        # Solo agregar a la tabla de anómalos si es clasificado como anómalo
-        if is_anomalous:
-            self.add_packet_to_table(self.anomaly_packets_table, packet_data)
+        # O(1) por paquete: las celdas se generan solo al pintarse
+        self.packet_store.add_records(shown)
 
-        # Actualizar contadores
-        classification_type = "Anómalo" if is_anomalous else "Normal"
-        self.classification_counts[classification_type] += 1
-        self.total_packets += 1
+        # Scroll automático agrupado: uno por vuelta del event loop
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(0, self._scroll_to_bottom)
 
         # Emitir estadísticas actualizadas
         self.emit_stats()
 
-    def add_packet_to_table(self, table, packet_data):
-        """Agregar paquete a una tabla específica"""
-        row = table.rowCount()
-        table.insertRow(row)
-
-        for col, value in enumerate(packet_data):
-            item = QTableWidgetItem(str(value))
-
-            # Colorear filas según clasificación
-            if col == 7:  # Columna de clasificación
-                value_str = str(value)
-
-                # Determinar tipo de clasificación
-                classification_type = "Normal"
-                if "Anómalo" in value_str or "ANOMALO" in value_str.upper():
-                    classification_type = "Anómalo"
-
-                # Aplicar colores
-                if classification_type in CLUSTER_COLORS:
-                    bg_color, fg_color = CLUSTER_COLORS[classification_type]
-                    item.setBackground(bg_color)
-                    item.setForeground(fg_color)
-
-            table.setItem(row, col, item)
-
-        # Mantener límite de filas para rendimiento
-        max_rows = (
-            MAX_PACKETS_PER_TABLE if "MAX_PACKETS_PER_TABLE" in globals() else 1000
-        )
-        if table.rowCount() > max_rows:
-            table.removeRow(0)
-
-        # Scroll automático a la última fila
-        table.scrollToBottom()
+    @staticmethod
+    def sample_rows(records, limit):
+        """Elegir hasta 'limit' filas en orden, priorizando los anómalos"""
+        if len(records) <= limit:
+            return records
+
+        anomalous = [i for i, record in enumerate(records) if record.is_anomalous]
+        if len(anomalous) >= limit:
+            # Solo caben anómalos: los más recientes
+            return [records[i] for i in anomalous[-limit:]]
+
+        # Todos los anómalos más uno de cada 'stride' normales (desde el final)
+        normal = [i for i, record in enumerate(records) if not record.is_anomalous]
+        stride = -(-len(normal) // (limit - len(anomalous)))
+        shown = set(anomalous)
+        shown.update(normal[::-stride])
+        return [record for i, record in enumerate(records) if i in shown]
+
+    def _scroll_to_bottom(self):
+        """Desplazar la vista visible a la última fila"""
+        self._scroll_pending = False
+        self.active_table.scrollToBottom()
 
     def emit_stats(self):
         """Emitir estadísticas actualizadas"""
@@ -212,7 +224,7 @@ class PacketTableManager(QWidget):
             "total": self.total_packets,
             "classification_counts": self.classification_counts.copy(),
             "current_view": self.current_view,
-            "anomaly_table_count": self.anomaly_packets_table.rowCount(),
+            "anomaly_table_count": self.packet_store.buffer.anomaly_count(),
         }
         self.stats_updated.emit(stats)
 
@@ -222,18 +234,19 @@ class PacketTableManager(QWidget):
             "total_packets": self.total_packets,
             "classification_counts": self.classification_counts.copy(),
             "current_view": self.current_view,
-            "anomaly_table_count": self.anomaly_packets_table.rowCount(),
-            "all_table_count": self.all_packets_table.rowCount(),
+            "anomaly_table_count": self.packet_store.buffer.anomaly_count(),
+            "all_table_count": len(self.packet_store.buffer),
+            "sampled_out_packets": self.sampled_out_packets,
         }
 
     def clear_tables(self):
         """Limpiar ambas tablas"""
-        self.all_packets_table.setRowCount(0)
-        self.anomaly_packets_table.setRowCount(0)
+        self.packet_store.clear()
 
     def clear_stats(self):
         """Resetear estadísticas"""
         self.total_packets = 0
+        self.sampled_out_packets = 0
         self.classification_counts = {"Normal": 0, "Anómalo": 0}
         self.emit_stats()
 
@@ -250,14 +263,44 @@ class PacketTableManager(QWidget):
             # Aquí podrías emitir una señal para continuar la captura
 
     def export_current_view(self):
-        """Exportar vista actual (funcionalidad futura)"""
-        # Placeholder para exportar datos de la tabla actual
-        table = self.active_table
-        row_count = table.rowCount()
-        col_count = table.columnCount()
-
-        print(f"[INFO] Exportando {row_count} filas de la vista actual")
-        # Implementar exportación a CSV, Excel, etc.
+        """Exportar la vista actual o el historial del almacén a CSV/JSONL"""
+        table = None
+        if self.flow_store is not None:
+            source, ok = QInputDialog.getItem(
+                self, "Exportar", "Origen:", list(EXPORT_SOURCES), 0, False
+            )
+            if not ok:
+                return
+            table = EXPORT_SOURCES[source]
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar", "captura.csv", EXPORT_FILTERS
+        )
+        if not path:
+            return
+
+        if table is None:
+            # Copia de las referencias visibles (como mucho MAX_PACKETS_PER_TABLE)
+            model = self.active_table.model()
+            records = [model.record_at(row) for row in range(model.rowCount())]
+            print(f"[INFO] Exportando {len(records)} filas de la vista actual")
+
+            def job(progress, cancelled):
+                return export_records(
+                    records, path, progress=progress, cancelled=cancelled
+                )
+
+        else:
+            store = self.flow_store
+
+            def job(progress, cancelled):
+                # Incluir lo aún pendiente en el escritor
+                store.flush()
+                return export_store(
+                    store, table, path, progress=progress, cancelled=cancelled
+                )
+
+        start_export(self, job, path)
 
     def get_current_table(self):
         """Obtener referencia a la tabla activa"""
@@ -234,9 +234,18 @@ class Sidebar(QWidget):
         )
         current_view = stats_data.get("current_view", "all")
         anomaly_table_count = stats_data.get("anomaly_table_count", 0)
+        capture_stats = stats_data.get("capture_stats")
+        load_shedding = stats_data.get("load_shedding")
+        profile = stats_data.get("profile")
 
         self.stats_panel.update_stats(
-            total, classification_counts, current_view, anomaly_table_count
+            total,
+            classification_counts,
+            current_view,
+            anomaly_table_count,
+            capture_stats,
+            load_shedding,
+            profile,
         )
 
     def get_current_view(self):
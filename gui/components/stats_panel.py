@@ -75,12 +75,21 @@ class StatsPanel(QWidget):
         self.current_view = "all"
 
     def update_stats(
-        self, total_packets, classification_counts, current_view, anomaly_table_count=0
+        self,
+        total_packets,
+        classification_counts,
+        current_view,
+        anomaly_table_count=0,
+        capture_stats=None,
+        load_shedding=None,
+        profile=None,
     ):
         """Actualizar estadísticas mostradas"""
         self.total_packets = total_packets
         self.classification_counts = classification_counts
         self.current_view = current_view
+        capture_stats = capture_stats or {"received": 0, "dropped": 0}
+        load_shedding = load_shedding or {"sample_rate": 1, "shed_packets": 0}
 
         # Calcular porcentajes
         normal_count = classification_counts.get("Normal", 0)
@@ -111,11 +120,33 @@ class StatsPanel(QWidget):
   • 🟢 Normales: {normal_count} ({normal_pct:.1f}%)
   • 🔴 Anómalos: {anomalo_count} ({anomalo_pct:.1f}%)
 
+📡 Captura (kernel):
+  • Recibidos: {capture_stats['received']}
+  • Descartados: {capture_stats['dropped']}
+  • Muestreo: 1 de {load_shedding['sample_rate']} flujos
+  • Omitidos por carga: {load_shedding['shed_packets']}
+
 ⏰ Tiempo: {time.strftime('%H:%M:%S')}
 🔄 Estado: Capturando..."""
+            if profile:
+                stats_text += self.format_profile(profile)
 
         self.stats_label.setText(stats_text)
 
+    def format_profile(self, profile):
+        """Resumen compacto del perfil por etapas (p50/p99 en µs)"""
+        lines = [
+            "",
+            "",
+            f"⏱️ Perfil ({profile['packets_per_sec']:,.0f} paq/s, "
+            f"{profile['flows']} flujos):",
+        ]
+        for stage, values in profile["stages"].items():
+            lines.append(
+                f"  • {stage}: {values['p50_us']:.1f} / {values['p99_us']:.1f} µs"
+            )
+        return "\n".join(lines)
+
     def update_model_info(self, model_name, clusters, categories, status):
         """Actualizar información del modelo"""
         info_text = f"""🤖 Información del Modelo:
@@ -1,5 +1,6 @@
 """Ventana principal de la aplicación"""
 
+import time
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget
 from PyQt5.QtCore import QTimer
 
@@ -10,7 +11,12 @@ from gui.styles.styles import MAIN_STYLESHEET
 from network.packet_sniffer import PacketSniffer
 
 # ✅ CORRECTO
-from config.settings import WINDOW_TITLE, WINDOW_SIZE, STATS_UPDATE_INTERVAL
+from config.settings import (
+    WINDOW_TITLE,
+    WINDOW_SIZE,
+    STATS_UPDATE_INTERVAL,
+    GUI_REFRESH_INTERVAL,
+)
 
 
 class MainWindow(QWidget):
@@ -53,10 +59,32 @@ class MainWindow(QWidget):
     def start_sniffer(self):
         """Iniciar captura de paquetes"""
         self.sniffer = PacketSniffer()
-        self.sniffer.packet_signal.connect(self.table_manager.add_packet)
+        self.table_manager.flow_store = self.sniffer.store
         self.sniffer.start()
 
+        # Recoger paquetes por lotes a ritmo de refresco de pantalla
+        self.packet_timer = QTimer()
+        self.packet_timer.timeout.connect(self.update_packets)
+        self.packet_timer.start(GUI_REFRESH_INTERVAL)
+
+    def update_packets(self):
+        """Pasar a la tabla los paquetes acumulados desde el último refresco"""
+        records = self.sniffer.drain()
+        if not records:
+            return
+        profiler = self.sniffer.engine.profiler
+        if profiler is None:
+            self.table_manager.add_packets(records)
+            return
+        start = time.perf_counter_ns()
+        self.table_manager.add_packets(records)
+        profiler.histogram("gui_frame").record(time.perf_counter_ns() - start)
+
     def update_stats(self):
         """Actualizar estadísticas"""
         stats = self.table_manager.get_statistics()
+        stats["capture_stats"] = self.sniffer.engine.capture_stats.copy()
+        stats["load_shedding"] = self.sniffer.engine.shedder.get_statistics()
+        if self.sniffer.engine.profiler is not None:
+            stats["profile"] = self.sniffer.engine.profile_snapshot()
         self.sidebar.update_stats(stats)
@@ -24,7 +24,7 @@ QPushButton.anomaly {
 QPushButton.anomaly:hover {
     background-color: #d32f2f;
 }
-QTableWidget {
+QTableView {
     background-color: white;
     alternate-background-color: #f9f9f9;
     selection-background-color: #007acc;
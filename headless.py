@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Sistema de Detección de Anomalías en Red
+Punto de entrada sin interfaz gráfica (servidores/sensores sin PyQt)
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+from network.capture import build_filter
+from network.engine import DetectionEngine
+from network.metrics import MetricsExporter
+from network.flow_store import FlowStore
+from network.export import export_store, format_for_path
+from network.pipeline import ShardedPipeline
+from network.replay import replay_pcap
+from network.profiling import format_profile, dump_profile
+from network.sinks import SINKS
+from config.settings import (
+    PACKET_FILTER,
+    PIPELINE_WORKERS,
+    CAPTURE_FILTER_SETS,
+    CAPTURE_EXCLUDE_NETS,
+    CAPTURE_EXCLUDE_PORTS,
+    CAPTURE_SNAPLEN,
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_BACKEND,
+    PROFILING_ENABLED,
+    METRICS_ENABLED,
+    METRICS_HOST,
+    METRICS_PORT,
+    STORE_ENABLED,
+    STORE_PATH,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Captura y clasifica tráfico sin interfaz gráfica"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(SINKS),
+        help="Formato (por defecto según la extensión de -o; .gz comprime)",
+    )
+    parser.add_argument("-o", "--output", required=True, help="Archivo de salida")
+    parser.add_argument(
+        "--filter",
+        default=PACKET_FILTER,
+        help=f"Filtro BPF o conjunto predefinido ({', '.join(CAPTURE_FILTER_SETS)})",
+    )
+    parser.add_argument(
+        "--exclude-net",
+        action="append",
+        default=list(CAPTURE_EXCLUDE_NETS),
+        help="Subred de confianza a descartar en el kernel (repetible)",
+    )
+    parser.add_argument(
+        "--exclude-port",
+        action="append",
+        type=int,
+        default=list(CAPTURE_EXCLUDE_PORTS),
+        help="Puerto de confianza a descartar en el kernel (repetible)",
+    )
+    parser.add_argument(
+        "--snaplen",
+        type=int,
+        default=CAPTURE_SNAPLEN,
+        help="Bytes copiados por trama (0 = trama completa)",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=CAPTURE_BUFFER_SIZE,
+        help="Buffer de recepción del socket en bytes (0 = por defecto)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["socket", "mmap"],
+        default=CAPTURE_BACKEND,
+        help="Captura por socket (recv por trama) o anillo mmap TPACKET_V3",
+    )
+    parser.add_argument(
+        "--pcap", help="Reproducir captura pcap/pcapng en vez de capturar"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="Velocidad de reproducción (0 = máxima, N = N veces tiempo real)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PIPELINE_WORKERS,
+        help="Procesos de seguimiento/clasificación (0 = un solo proceso)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=PROFILING_ENABLED,
+        help="Medir latencia por etapa y mostrar p50/p99/p99.9 al terminar",
+    )
+    parser.add_argument(
+        "--profile-json", help="Guardar además el perfil en este archivo JSON"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT if METRICS_ENABLED else None,
+        help=f"Publicar métricas Prometheus en http://{METRICS_HOST}:PUERTO/metrics",
+    )
+    parser.add_argument(
+        "--store",
+        default=STORE_PATH if STORE_ENABLED else None,
+        help="Guardar flujos finalizados y alertas en este directorio",
+    )
+    parser.add_argument(
+        "--export",
+        choices=["flows", "alerts"],
+        help="Exportar del almacén (--store) a -o en vez de capturar (.gz comprime)",
+    )
+    parser.add_argument(
+        "--from",
+        dest="start",
+        type=parse_time,
+        help="Inicio de la exportación (epoch o ISO 8601)",
+    )
+    parser.add_argument(
+        "--to", dest="end", type=parse_time, help="Fin de la exportación"
+    )
+    parser.add_argument("--ip", help="Exportar solo filas con esta IP")
+    parser.add_argument("--port", type=int, help="Exportar solo filas con este puerto")
+    args = parser.parse_args()
+    # Cada trabajador tiene su propio motor: no hay un perfil único que mostrar
+    if args.workers > 0 and (args.profile or args.profile_json):
+        parser.error("--profile/--profile-json no se admiten con --workers")
+    return args
+
+
+def parse_time(value):
+    """Marca de tiempo epoch o fecha ISO 8601 (hora local) a epoch"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def run_export(args):
+    """Exportar filas del almacén sin abrir la captura"""
+    if not args.store:
+        print("[ERROR] --export necesita --store")
+        return
+    # FlowStore crearía un almacén vacío en una ruta mal escrita
+    if not os.path.isfile(os.path.join(args.store, "store.json")):
+        print(f"[ERROR] No existe un almacén en: {args.store}")
+        return
+    store = FlowStore(args.store)
+    written = export_store(
+        store,
+        args.export,
+        args.output,
+        args.format,
+        args.start,
+        args.end,
+        args.ip,
+        args.port,
+        progress=lambda fraction: print(f"\r[INFO] {fraction:6.1%}", end=""),
+    )
+    print(f"\n[OK] {written} filas exportadas a: {args.output}")
+
+
+def main():
+    args = parse_args()
+    if args.export:
+        run_export(args)
+        return
+    print("[INFO] Iniciando Sistema de Detección de Anomalías (headless)...")
+
+    sink = SINKS[args.format or format_for_path(args.output)](args.output)
+    capture_options = {
+        "packet_filter": build_filter(args.filter, args.exclude_net, args.exclude_port),
+        "snaplen": args.snaplen,
+        "buffer_size": args.buffer_size,
+        "backend": args.backend,
+    }
+    if args.workers > 0:
+        engine = ShardedPipeline(args.workers, **capture_options)
+    else:
+        engine = DetectionEngine(profiling=args.profile, **capture_options)
+    engine.subscribe(sink)
+    exporter = None
+    if args.metrics_port is not None:
+        exporter = MetricsExporter(engine, port=args.metrics_port)
+        exporter.start()
+    store = None
+    if args.store:
+        store = FlowStore(args.store)
+        store.start()
+        engine.attach_store(store)
+
+    try:
+        if args.pcap and args.workers > 0:
+            result = engine.replay(args.pcap, args.speed)
+        elif args.pcap:
+            result = replay_pcap(engine, args.pcap, args.speed)
+        if args.pcap:
+            print(
+                f"[INFO] Reproducción: {result['packets']} paquetes en "
+                f"{result['elapsed']:.2f} s ({result['packets_per_sec']:,.0f} paquetes/s)"
+            )
+        else:
+            print(f"[INFO] Filtro BPF: {capture_options['packet_filter']}")
+            engine.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+        if exporter is not None:
+            exporter.stop()
+        if store is not None:
+            if args.workers == 0 and not args.pcap:
+                # Registrar también los flujos aún abiertos
+                engine.flow_tracker.flush()
+            store.stop()
+            print(
+                f"[OK] Almacén {args.store}: {store.written['flows']} flujos, "
+                f"{store.written['alerts']} alertas"
+            )
+        print(f"[INFO] Paquetes procesados: {engine.packet_count}")
+        if not args.pcap:
+            print(
+                f"[INFO] Kernel: {engine.capture_stats['received']} recibidos, "
+                f"{engine.capture_stats['dropped']} descartados"
+            )
+        if args.workers == 0 and engine.shedder.shed_packets:
+            print(
+                f"[INFO] Omitidos por sobrecarga: {engine.shedder.shed_packets} "
+                f"(muestreo final 1 de {engine.shedder.sample_rate} flujos)"
+            )
+        if args.workers == 0 and engine.profiler is not None:
+            profile = engine.profile_snapshot()
+            print(format_profile(profile))
+            if args.profile_json:
+                dump_profile(profile, args.profile_json)
+                print(f"[OK] Perfil guardado en: {args.profile_json}")
+        print(f"[OK] Clasificaciones guardadas en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
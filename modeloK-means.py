@@ -175,6 +175,13 @@ def train_improved_model(X, y):
     joblib.dump(kmeans, "kmeans_model_improved.pkl")
     joblib.dump(scaler, "scaler_kmeans_improved.pkl")
 
+    # Exportar kernel NumPy para la captura (sin scikit-learn en tiempo real)
+    from models.inference_kernel import export_kernel
+
+    export_kernel(
+        "kmeans_model_improved.pkl", "scaler_kmeans_improved.pkl", "kmeans_kernel.npz"
+    )
+
     print("[OK] Modelo mejorado guardado!")
     return kmeans, scaler
 
@@ -265,6 +272,7 @@ def main():
     print("Archivos generados:")
     print("   - kmeans_model_improved.pkl")
     print("   - scaler_kmeans_improved.pkl")
+    print("   - kmeans_kernel.npz")
     print("   - cluster_mapping_guide.txt")
     print("\nPROXIMOS PASOS:")
     print("1. Copia los archivos .pkl sobre los originales")
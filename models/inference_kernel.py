@@ -0,0 +1,117 @@
+"""Kernel de inferencia K-Means en NumPy puro (sin scikit-learn en captura)"""
+
+import hashlib
+import os
+
+import numpy as np
+
+
+class InferenceKernel:
+    """Predictor de centroide más cercano con el MinMaxScaler fusionado
+
+    Para x escalado como x * scale + min, la distancia al centroide c es
+    ||x_s||² - 2·x_s·c + ||c||². El término ||x_s||² no afecta al argmin, así
+    que basta con argmin(bias - 2·x·W) con W = scale * c y
+    bias = ||c||² - 2·min·c, ambos precalculados al exportar.
+    """
+
+    def __init__(self, weights, bias, source=None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)  # (8, k)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float64)  # (k,)
+        self.n_clusters = self.bias.shape[0]
+        # Huella de los .pkl de origen (ver model_fingerprint)
+        self.source = source
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        """Compilar kernel desde un KMeans y un MinMaxScaler entrenados"""
+        centers = np.asarray(model.cluster_centers_, dtype=np.float64)
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+        offset = np.asarray(scaler.min_, dtype=np.float64)
+
+        weights = (centers * scale).T
+        bias = np.einsum("ij,ij->i", centers, centers) - 2.0 * centers @ offset
+        return cls(weights, bias)
+
+    @classmethod
+    def load(cls, path):
+        """Cargar kernel exportado (.npz)"""
+        with np.load(path) as data:
+            source = str(data["source"]) if "source" in data.files else None
+            return cls(data["weights"], data["bias"], source)
+
+    def save(self, path):
+        """Guardar kernel en formato .npz (reemplazo atómico del archivo)"""
+        arrays = {"weights": self.weights, "bias": self.bias}
+        if self.source is not None:
+            arrays["source"] = np.array(self.source)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **arrays)
+        os.replace(temporary, path)
+
+    def predict(self, features):
+        """Asignar cluster a cada fila de una matriz (N, 8) sin escalar"""
+        scores = self.bias - 2.0 * (features @ self.weights)
+        return scores.argmin(axis=1)
+
+
+def model_fingerprint(model_path, scaler_path):
+    """Tamaño y SHA-256 de los .pkl (sin cargarlos ni importar scikit-learn)"""
+    parts = []
+    for path in (model_path, scaler_path):
+        with open(path, "rb") as handle:
+            digest = hashlib.sha256(handle.read()).hexdigest()
+        parts.append(f"{os.path.getsize(path)}:{digest}")
+    return ";".join(parts)
+
+
+def export_kernel(model_path, scaler_path, kernel_path):
+    """Compilar el kernel desde los .pkl entrenados y guardarlo"""
+    import joblib
+
+    kernel = InferenceKernel.from_sklearn(
+        joblib.load(model_path), joblib.load(scaler_path)
+    )
+    kernel.source = model_fingerprint(model_path, scaler_path)
+    kernel.save(kernel_path)
+    print(f"[OK] Kernel de inferencia guardado en: {kernel_path}")
+    return kernel
+
+
+def verify_kernel(kernel, model_path, scaler_path, dataset_path):
+    """Comparar asignaciones del kernel con model.predict sobre NSL-KDD"""
+    import importlib.util
+    import joblib
+
+    spec = importlib.util.spec_from_file_location("modelo_kmeans", "modeloK-means.py")
+    modelo_kmeans = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modelo_kmeans)
+
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+
+    # prepare_nsl_kdd concatena train y test; aquí ambos son el mismo archivo
+    df = modelo_kmeans.prepare_nsl_kdd(dataset_path, dataset_path)
+    df = df.iloc[: len(df) // 2]
+    X, _ = modelo_kmeans.create_flow_features(df)
+    X = X.replace([np.inf, -np.inf], np.nan)
+    X = X.fillna(X.median()).to_numpy(dtype=np.float64)
+
+    expected = model.predict(scaler.transform(X))
+    got = kernel.predict(X)
+    mismatches = int((expected != got).sum())
+
+    print(f"[INFO] Filas verificadas: {len(X)}, diferencias: {mismatches}")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    import sys
+    from config.settings import MODEL_PATH, SCALER_PATH, KERNEL_PATH
+
+    kernel = export_kernel(MODEL_PATH, SCALER_PATH, KERNEL_PATH)
+    if not verify_kernel(kernel, MODEL_PATH, SCALER_PATH, "NSL_KDD_test.txt"):
+        print("[ERROR] El kernel no coincide con model.predict")
+        sys.exit(1)
+    print("[OK] Asignaciones idénticas a model.predict")
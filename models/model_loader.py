@@ -1,8 +1,9 @@
 """Carga y gestión de modelos de machine learning"""
 
-import joblib
+import os
 import sys
-from config.settings import MODEL_PATH, SCALER_PATH
+from config.settings import MODEL_PATH, SCALER_PATH, KERNEL_PATH
+from models.inference_kernel import InferenceKernel, model_fingerprint
 
 
 class ModelLoader:
@@ -12,8 +13,19 @@ class ModelLoader:
         self.load_models()
 
     def load_models(self):
-        """Cargar modelo y escalador"""
+        """Cargar kernel NumPy exportado o, si no existe, modelo y escalador"""
+        if os.path.exists(KERNEL_PATH):
+            # El kernel ya incluye el escalado: no hace falta scikit-learn
+            self.kmeans_model = InferenceKernel.load(KERNEL_PATH)
+            self.scaler = None
+            print("[OK] Kernel de inferencia cargado correctamente")
+            print(f"[INFO] Modelo con {self.kmeans_model.n_clusters} clusters")
+            self._check_kernel_source()
+            return
+
         try:
+            import joblib
+
             self.kmeans_model = joblib.load(MODEL_PATH)
             self.scaler = joblib.load(SCALER_PATH)
             print("[OK] Modelo y escalador cargados correctamente")
@@ -23,6 +35,21 @@ class ModelLoader:
             print("Ejecuta primero 'python quick_dataset_setup.py'")
             sys.exit(1)
 
+    def _check_kernel_source(self):
+        """Avisar si los .pkl no son los que generaron el kernel cargado
+
+        Solo se compara la huella guardada al exportar; el kernel nunca se
+        regenera aquí (eso requiere scikit-learn en la captura).
+        """
+        if not all(os.path.exists(path) for path in (MODEL_PATH, SCALER_PATH)):
+            return
+        if self.kmeans_model.source is None:
+            print(f"[INFO] {KERNEL_PATH} sin huella del modelo (exportado antes)")
+            return
+        if model_fingerprint(MODEL_PATH, SCALER_PATH) != self.kmeans_model.source:
+            print(f"[ERROR] {KERNEL_PATH} no corresponde a {MODEL_PATH}")
+            print("Regenera el kernel con 'python -m models.inference_kernel'")
+
     def get_model(self):
         return self.kmeans_model
 
@@ -1,13 +1,32 @@
 """Clasificadores de paquetes"""
 
+import os
+
 import numpy as np
 from config.cluster_mapping import CLUSTER_MAPPING
+from config.settings import PORT_RISK_PATH
+
+
+# Filas de las tablas de riesgo: 0 = otros protocolos
+PROTOCOL_ROWS = {"TCP": 1, "UDP": 2}
+_PROTOCOL_NUMBERS = {"TCP": 6, "UDP": 17}
+MAX_PORT = 65535
+MAX_PACKET_SIZE = 65535  # Tamaños mayores puntúan como el máximo
+ANOMALY_THRESHOLD = 1
 
 
 class SimplePacketClassifier:
-    """Clasificador heurístico simple"""
+    """Clasificador heurístico simple
 
-    def __init__(self):
+    La heurística se compila a tablas de 65536 entradas: una puntuación de
+    riesgo por puerto y protocolo (TCP, UDP, otros) y otra por tamaño de
+    paquete. Clasificar es sumar cuatro lecturas de tabla, y classify_batch
+    hace lo mismo sobre arrays con NumPy. Las puntuaciones por defecto
+    reproducen las reglas de normal_ranges; el archivo de riesgo de puertos
+    (PORT_RISK_PATH) las ajusta sin tocar código.
+    """
+
+    def __init__(self, port_risk_path=PORT_RISK_PATH):
         self.normal_ranges = {
             "packet_size": (20, 1500),
             "common_ports": {
@@ -15,55 +34,141 @@ class SimplePacketClassifier:
                 "UDP": [53, 67, 68, 123, 161, 162, 514],
             },
         }
+        self.port_risk = self._default_port_risk()
+        if port_risk_path and os.path.exists(port_risk_path):
+            with open(port_risk_path, encoding="utf-8") as handle:
+                apply_port_rules(self.port_risk, handle, port_risk_path)
+        self.size_risk = self._size_risk()
+
+        # Protocolo IP (número) -> fila de port_risk
+        self.protocol_rows = np.zeros(256, dtype=np.intp)
+        for name, row in PROTOCOL_ROWS.items():
+            self.protocol_rows[_PROTOCOL_NUMBERS[name]] = row
+        # memoryview: lectura escalar sin crear escalares de NumPy
+        self._row_view = memoryview(self.protocol_rows)
+        self._port_views = [memoryview(row) for row in self.port_risk]
+        self._size_view = memoryview(self.size_risk)
+
+    def _default_port_risk(self):
+        """Tabla (3, 65536) con las reglas de puertos por defecto"""
+        table = np.zeros((len(PROTOCOL_ROWS) + 1, MAX_PORT + 1), dtype=np.float32)
+        table[:, :1024] = 1  # Puertos privilegiados no comunes
+        table[:, 49153:] = 1  # Puertos efímeros altos
+        table[:, [1337, 31337, 12345, 54321]] = 1
+        for name, ports in self.normal_ranges["common_ports"].items():
+            table[PROTOCOL_ROWS[name], ports] = 0
+        return table
+
+    def _size_risk(self):
+        """Tabla de puntuación por tamaño de paquete (0-65535 bytes)"""
+        sizes = np.arange(MAX_PACKET_SIZE + 1)
+        min_size, max_size = self.normal_ranges["packet_size"]
+        table = np.where((sizes < min_size) | (sizes > max_size), 1.0, 0.0)
+        table += np.where((sizes < 64) | (sizes > 1400), 0.5, 0.0)
+        return table.astype(np.float32)
 
     def is_suspicious_port(self, port, protocol):
-        """Verificar si un puerto es sospechoso"""
-        common_ports = self.normal_ranges["common_ports"].get(protocol, [])
-
-        suspicious_conditions = [
-            port > 49152,
-            port in [1337, 31337, 12345, 54321],
-            port < 1024 and port not in common_ports,
-        ]
-
-        return any(suspicious_conditions)
+        """Verificar si un puerto es sospechoso (protocolo como número IP)"""
+        return self._port_views[self._row_view[protocol]][port] > 0
 
     def classify_single_packet(self, packet_size, src_port, dst_port, protocol):
-        """Clasificación simple basada en heurísticas"""
-        suspicion_score = 0
-
-        min_size, max_size = self.normal_ranges["packet_size"]
-        if packet_size < min_size or packet_size > max_size:
-            suspicion_score += 1
-
-        if self.is_suspicious_port(src_port, protocol):
-            suspicion_score += 1
-        if self.is_suspicious_port(dst_port, protocol):
-            suspicion_score += 1
-
-        if packet_size < 64 or packet_size > 1400:
-            suspicion_score += 0.5
-
-        return "Anómalo" if suspicion_score >= 1 else "Normal"
+        """Clasificación simple basada en heurísticas (protocolo como número IP)"""
+        ports = self._port_views[self._row_view[protocol]]
+        suspicion_score = (
+            self._size_view[min(packet_size, MAX_PACKET_SIZE)]
+            + ports[src_port]
+            + ports[dst_port]
+        )
+        return "Anómalo" if suspicion_score >= ANOMALY_THRESHOLD else "Normal"
+
+    def score_batch(self, sizes, src_ports, dst_ports, protocols):
+        """Puntuación de sospecha de un lote (protocolos como número IP)"""
+        sizes = np.minimum(np.asarray(sizes, dtype=np.int64), MAX_PACKET_SIZE)
+        rows = self.protocol_rows[np.asarray(protocols, dtype=np.uint8)]
+        return (
+            self.size_risk[sizes]
+            + self.port_risk[rows, np.asarray(src_ports, dtype=np.uint16)]
+            + self.port_risk[rows, np.asarray(dst_ports, dtype=np.uint16)]
+        )
+
+    def classify_batch(self, sizes, src_ports, dst_ports, protocols):
+        """Array de bool (True = anómalo) para un lote de paquetes"""
+        return (
+            self.score_batch(sizes, src_ports, dst_ports, protocols)
+            >= ANOMALY_THRESHOLD
+        )
+
+
+def apply_port_rules(table, lines, path):
+    """Aplicar reglas 'protocolo puertos puntuación' sobre una tabla de riesgo
+
+    protocolo: TCP, UDP, OTROS o * (todos); puertos: lista separada por
+    comas de puertos o rangos (p. ej. 1337,6660-6669). Cada regla
+    sustituye la puntuación anterior de sus puertos. Las líneas no válidas
+    se informan y se omiten.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            protocol, ports, score = line.split()
+            rows = _parse_protocol(protocol)
+            score = float(score)
+            for start, end in _parse_ports(ports):
+                table[rows, start : end + 1] = score
+        except ValueError:
+            print(f"[ERROR] {path}:{number}: regla no válida '{line}'")
+
+
+def _parse_protocol(protocol):
+    protocol = protocol.upper()
+    if protocol == "*":
+        return slice(None)
+    if protocol == "OTROS":
+        return 0
+    if protocol in PROTOCOL_ROWS:
+        return PROTOCOL_ROWS[protocol]
+    raise ValueError(f"protocolo no válido: {protocol}")
+
+
+def _parse_ports(ports):
+    for item in ports.split(","):
+        start, _, end = item.partition("-")
+        start = int(start)
+        end = int(end) if end else start
+        if not 0 <= start <= end <= MAX_PORT:
+            raise ValueError(f"rango de puertos no válido: {item}")
+        yield start, end
 
 
 class KMeansClassifier:
     """Clasificador usando K-Means"""
 
-    def __init__(self, model, scaler):
+    def __init__(self, model, scaler=None):
+        # Con un InferenceKernel el escalado ya está fusionado (scaler=None)
         self.model = model
         self.scaler = scaler
 
     def classify(self, features):
         """Clasificar usando K-Means"""
+        return self.classify_batch([features])[0]
+
+    def classify_batch(self, features_matrix):
+        """Clasificar un lote (N, 8) de vectores con una sola llamada al modelo"""
         try:
-            input_features = np.array([features])
-            input_scaled = self.scaler.transform(input_features)
-            cluster = self.model.predict(input_scaled)[0]
+            clusters = self.predict_clusters(features_matrix)
+        except Exception as e:
+            return [(None, f"Error: {str(e)[:15]}")] * len(features_matrix)
 
-            clasificacion = CLUSTER_MAPPING.get(cluster, "Anómalo")
-            method = f"K-Means (C{cluster})"
+        return [
+            (CLUSTER_MAPPING.get(cluster, "Anómalo"), f"K-Means (C{cluster})")
+            for cluster in clusters
+        ]
 
-            return clasificacion, method
-        except Exception as e:
-            return None, f"Error: {str(e)[:15]}"
+    def predict_clusters(self, features_matrix):
+        """Obtener la lista de clusters de un lote (propaga errores del modelo)"""
+        input_features = np.asarray(features_matrix, dtype=np.float64)
+        if self.scaler is not None:
+            input_features = self.scaler.transform(input_features)
+        return self.model.predict(input_features).tolist()
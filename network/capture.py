@@ -0,0 +1,131 @@
+"""Socket de captura ajustado: filtro BPF en el kernel, snaplen y buffer
+
+El filtro descarta en el kernel el tráfico de confianza antes de copiarlo
+al proceso, y el snaplen hace que el mismo programa BPF recorte cada trama
+a sus cabeceras (el parser solo necesita hasta los puertos).
+
+Los backends de captura comparten la interfaz read_batch(timeout) ->
+[(trama, marca de captura, linktype)], drop_stats() y close().
+"""
+
+import socket
+import struct
+
+from scapy.all import conf
+from scapy.arch.common import compile_filter, free_filter
+from scapy.libs.structures import bpf_insn, sock_fprog
+
+from config.settings import (
+    PACKET_FILTER,
+    CAPTURE_FILTER_SETS,
+    CAPTURE_EXCLUDE_NETS,
+    CAPTURE_EXCLUDE_PORTS,
+    CAPTURE_SNAPLEN,
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_BACKEND,
+)
+
+# Constantes de Linux (<linux/filter.h>, <linux/if_packet.h>)
+SO_ATTACH_FILTER = 26
+SO_RCVBUFFORCE = 33
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+_BPF_RET_K = 0x06
+_TPACKET_STATS = struct.Struct("II")
+
+
+def build_filter(
+    base=PACKET_FILTER,
+    exclude_nets=CAPTURE_EXCLUDE_NETS,
+    exclude_ports=CAPTURE_EXCLUDE_PORTS,
+):
+    """Expresión BPF: filtro base (o nombre de CAPTURE_FILTER_SETS) sin exclusiones"""
+    base = CAPTURE_FILTER_SETS.get(base, base)
+    clauses = [f"({base})"] if base else []
+    if exclude_nets:
+        nets = " or ".join(f"net {net}" for net in exclude_nets)
+        clauses.append(f"not ({nets})")
+    if exclude_ports:
+        ports = " or ".join(f"port {port}" for port in exclude_ports)
+        clauses.append(f"not ({ports})")
+    return " and ".join(clauses)
+
+
+def open_capture(
+    packet_filter,
+    snaplen=CAPTURE_SNAPLEN,
+    buffer_size=CAPTURE_BUFFER_SIZE,
+    backend=CAPTURE_BACKEND,
+):
+    """Abrir el backend de captura ("socket" o "mmap") con filtro, snaplen y buffer"""
+    if backend == "mmap":
+        from network.mmap_capture import MmapCapture
+
+        return MmapCapture(packet_filter, snaplen, buffer_size)
+    return SocketCapture(packet_filter, snaplen, buffer_size)
+
+
+class SocketCapture:
+    """Lectura trama a trama del socket L2 de Scapy (recv_raw)"""
+
+    def __init__(self, packet_filter, snaplen, buffer_size):
+        if not snaplen:
+            self.sock = conf.L2listen(filter=packet_filter or None)
+        else:
+            self.sock = conf.L2listen()
+            attach_filter(self.sock.ins, packet_filter, snaplen, self.sock.iface)
+
+        if buffer_size:
+            try:
+                # SO_RCVBUFFORCE ignora rmem_max (requiere CAP_NET_ADMIN)
+                self.sock.ins.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, buffer_size)
+            except OSError:
+                self.sock.ins.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size
+                )
+
+    def read_batch(self, timeout):
+        """Esperar hasta 'timeout' segundos y devolver la trama disponible"""
+        if not self.sock.select([self.sock], timeout):
+            return []
+        # Leer bytes crudos sin que Scapy construya el paquete
+        link_layer, frame, capture_time = self.sock.recv_raw()
+        if not frame:
+            return []
+        linktype = conf.l2types.layer2num.get(link_layer, -1)
+        return [(frame, capture_time, linktype)]
+
+    def drop_stats(self):
+        """(recibidos, descartados) desde la última lectura"""
+        return read_drop_stats(self.sock.ins)
+
+    def close(self):
+        self.sock.close()
+
+
+def attach_filter(raw_socket, packet_filter, snaplen, iface=None):
+    """Adjuntar el filtro con las instrucciones de aceptación recortadas a snaplen"""
+    if packet_filter:
+        program = compile_filter(packet_filter, iface)
+        instructions = program.bf_insns
+        for index in range(program.bf_len):
+            # "ret #k" con k > 0 acepta k bytes de la trama
+            if instructions[index].code == _BPF_RET_K and instructions[index].k:
+                instructions[index].k = snaplen
+        fprog = sock_fprog(program.bf_len, instructions)
+        raw_socket.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+        free_filter(program)
+    else:
+        # Sin expresión no hace falta libpcap: aceptar todo recortado
+        instructions = (bpf_insn * 1)(bpf_insn(_BPF_RET_K, 0, 0, snaplen))
+        fprog = sock_fprog(1, instructions)
+        raw_socket.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def read_drop_stats(raw_socket):
+    """(recibidos, descartados) desde la última lectura (el kernel los reinicia)"""
+    try:
+        raw = raw_socket.getsockopt(SOL_PACKET, PACKET_STATISTICS, _TPACKET_STATS.size)
+    except OSError:
+        return 0, 0
+    return _TPACKET_STATS.unpack_from(raw)
@@ -0,0 +1,449 @@
+"""Motor de captura y clasificación independiente de la interfaz gráfica"""
+
+import threading
+import time
+from scapy.all import conf, IP, IPv6, TCP, UDP
+
+from models.model_loader import ModelLoader
+from models.packet_classifier import SimplePacketClassifier, KMeansClassifier
+from network.flow_tracker import FlowTracker
+from network.micro_batcher import MicroBatcher
+from network.load_shedder import LoadShedder
+from network.profiling import Profiler
+from network.capture import build_filter, open_capture
+from network.fast_parser import parse_frame, UnsupportedFrame, DLT_EN10MB
+from network.packet_record import (
+    PacketRecord,
+    Classification,
+    Method,
+    new_classification_counts,
+)
+from network.flow_store import UNCLASSIFIED
+from network.prefix_index import PrefixLists
+from config.cluster_mapping import CLUSTER_MAPPING
+from config.settings import (
+    CLEANUP_INTERVAL,
+    CAPTURE_SNAPLEN,
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_BACKEND,
+    CAPTURE_STATS_INTERVAL,
+    PROFILING_ENABLED,
+    VERDICT_CACHE_ENABLED,
+    VERDICT_CHECKPOINT_FACTOR,
+    VERDICT_DRIFT_THRESHOLD,
+)
+
+# Clasificación asociada a cada cluster del modelo
+CLUSTER_CLASSIFICATION = {
+    cluster: Classification.from_label(label)
+    for cluster, label in CLUSTER_MAPPING.items()
+}
+
+# Clasificación impuesta por cada lista de prefijos
+LIST_CLASSIFICATION = {
+    Method.LISTA_PERMITIDA: Classification.NORMAL,
+    Method.LISTA_VIGILANCIA: Classification.ANOMALO,
+}
+
+
+class DetectionEngine:
+    """Captura, seguimiento de flujos y clasificación sin dependencias de Qt
+
+    Cada paquete clasificado se entrega a los suscriptores como un PacketRecord.
+    """
+
+    def __init__(
+        self,
+        packet_filter=None,
+        snaplen=CAPTURE_SNAPLEN,
+        buffer_size=CAPTURE_BUFFER_SIZE,
+        backend=CAPTURE_BACKEND,
+        profiling=PROFILING_ENABLED,
+        verdict_cache=VERDICT_CACHE_ENABLED,
+    ):
+        # Sin filtro explícito: PACKET_FILTER con las exclusiones de settings
+        self.packet_filter = build_filter() if packet_filter is None else packet_filter
+        self.snaplen = snaplen
+        self.buffer_size = buffer_size
+        self.backend = backend
+        self.start_time = time.time()
+        self.packet_count = 0
+        self.capture_stats = {"received": 0, "dropped": 0}
+        self.last_cleanup = 0.0
+        self.expired_flows = {"Normal": 0, "Anómalo": 0}
+        self.classification_counts = new_classification_counts()
+        self.verdict_cache = verdict_cache
+        self.verdict_cache_stats = {"hits": 0, "misses": 0}
+        self.subscribers = []
+        self.store = None
+        self._stop_event = threading.Event()
+
+        # Inicializar componentes
+        model_loader = ModelLoader()
+        self.flow_tracker = FlowTracker()
+        self.flow_tracker.add_expiry_callback(self._on_flow_expired)
+        self.simple_classifier = SimplePacketClassifier()
+        self.kmeans_classifier = KMeansClassifier(
+            model_loader.get_model(), model_loader.get_scaler()
+        )
+        self.batcher = MicroBatcher(self._classify_batch)
+        self.shedder = LoadShedder()
+        self.prefix_lists = PrefixLists()
+
+        # Etapas reemplazables por versiones cronometradas (ver instrument());
+        # el perfilador solo cambia estos atributos, nunca los componentes
+        self.decode_frame = decode_frame
+        self.track_packet = self.flow_tracker.add_packet
+        self.compute_flow_features = self.flow_tracker.calculate_flow_features
+        self.predict_batch = self.kmeans_classifier.predict_clusters
+        self.profiler = None
+        if profiling:
+            self.instrument(Profiler())
+
+    def instrument(self, profiler):
+        """Registrar las etapas del motor; se cronometran por ventanas"""
+        self.profiler = profiler
+        self._profile_mark = (time.monotonic(), self.packet_count)
+        profiler.hook(self, "decode_frame", "decode")
+        profiler.hook(self, "track_packet", "flow_update")
+        profiler.hook(self, "compute_flow_features", "flow_features")
+        # Solo los lotes: la clasificación final de flujos expirados no pasa por aquí
+        profiler.hook(self, "predict_batch", "kmeans_batch")
+        profiler.hook(self.batcher, "flush_callback", "classify_deliver")
+        profiler.arm()
+
+    def profile_snapshot(self):
+        """Perfil actual: percentiles por etapa, paquetes/s y flujos en tabla"""
+        now = time.monotonic()
+        last_time, last_count = self._profile_mark
+        self._profile_mark = (now, self.packet_count)
+        return {
+            "packets_per_sec": (self.packet_count - last_count)
+            / max(now - last_time, 1e-9),
+            "flows": len(self.flow_tracker.flows),
+            "stages": self.profiler.snapshot(),
+        }
+
+    def subscribe(self, callback):
+        """Registrar callback(data) que recibe cada paquete clasificado"""
+        self.subscribers.append(callback)
+
+    def attach_store(self, store):
+        """Guardar en 'store' los flujos finalizados y los paquetes anómalos"""
+        self.store = store
+        self.subscribe(self._store_alert)
+
+    def _store_alert(self, record):
+        if record.classification == Classification.ANOMALO:
+            self.store.add_alert(record, self.start_time)
+
+    def run(self):
+        """Iniciar captura de paquetes (bloqueante hasta stop())"""
+        print("[INFO] Iniciando captura de paquetes...")
+        self._stop_event.clear()
+        self.batcher.start()
+        capture = open_capture(
+            self.packet_filter, self.snaplen, self.buffer_size, self.backend
+        )
+        last_stats = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                batch = capture.read_batch(0.5)
+                for frame, capture_time, linktype in batch:
+                    self.process_frame(frame, capture_time, linktype)
+                if batch and batch[-1][1]:
+                    # Retraso entre captura y procesamiento: medida de backlog
+                    self.shedder.observe_lag(time.time() - batch[-1][1])
+                self.maintain_idle()
+
+                if time.monotonic() - last_stats >= CAPTURE_STATS_INTERVAL:
+                    last_stats = time.monotonic()
+                    self.update_capture_stats(capture)
+        finally:
+            self.update_capture_stats(capture)
+            capture.close()
+            self.batcher.stop()
+
+    def stop(self):
+        """Solicitar fin de la captura"""
+        self._stop_event.set()
+
+    def update_capture_stats(self, capture):
+        """Acumular los contadores del kernel (recibidos incluye descartados)"""
+        received, dropped = capture.drop_stats()
+        self.capture_stats["received"] += received
+        self.capture_stats["dropped"] += dropped
+
+    def process_frame(self, frame, current_time=None, linktype=DLT_EN10MB):
+        """Procesar trama cruda con el parser rápido (Scapy como respaldo)"""
+        try:
+            fields = self.decode_frame(frame, linktype)
+            if fields is not None:
+                self.process_fields(fields, current_time)
+
+        except Exception as e:
+            print(f"[ERROR] Error procesando paquete: {e}")
+
+    def process_packet(self, packet, current_time=None):
+        """Procesar paquete ya disecado por Scapy"""
+        try:
+            fields = dissect_with_scapy(packet)
+            if fields is not None:
+                self.process_fields(fields, current_time)
+
+        except Exception as e:
+            print(f"[ERROR] Error procesando paquete: {e}")
+
+    def process_fields(self, fields, current_time=None, number=None):
+        """Registrar, seguir y encolar un paquete IP ya decodificado
+
+        'number' permite conservar la numeración global cuando los paquetes
+        llegan repartidos desde otro proceso (ver network/pipeline.py).
+        """
+        src_ip, dst_ip, protocol, src_port, dst_port, packet_length = fields
+
+        # Bajo sobrecarga, procesar solo los flujos muestreados
+        if self.shedder.sample_rate > 1:
+            flow_key = self.flow_tracker.get_flow_key(
+                src_ip, dst_ip, src_port, dst_port, protocol
+            )
+            if not self.shedder.admit(
+                flow_key, flow_key not in self.flow_tracker.flows
+            ):
+                return
+
+        if current_time is None:
+            current_time = time.time()
+        self.packet_count += 1
+        if number is None:
+            number = self.packet_count
+
+        # Construir registro del paquete
+        timestamp = round(current_time - self.start_time, 6)
+        record = PacketRecord(
+            number,
+            timestamp,
+            src_ip,
+            dst_ip,
+            protocol,
+            src_port,
+            dst_port,
+            packet_length,
+        )
+
+        # Actualizar flujo y encolar para clasificación por lotes
+        flow_key = self.track_packet(
+            src_ip, dst_ip, src_port, dst_port, protocol, packet_length, timestamp
+        )
+        # El FlowRecord viaja con el paquete: el veredicto se guarda en este
+        # flujo aunque la clave se reutilice tras expirar antes del lote
+        flow = self.flow_tracker.flows[flow_key] if self.verdict_cache else None
+        if flow is not None and self._cached_verdict(record, flow):
+            flow_features = None
+        else:
+            flow_features = self.compute_flow_features(flow_key)
+        self.batcher.add((record, flow_features, flow_key, flow))
+
+        # Expirar flujos inactivos según reloj (mismo reloj que los flujos)
+        if timestamp - self.last_cleanup >= CLEANUP_INTERVAL:
+            self.maintain(timestamp)
+
+    def maintain(self, timestamp):
+        """Tareas periódicas: expirar flujos, recargar listas y rearmar el perfil
+
+        'timestamp' es relativo a start_time, como las marcas de los flujos.
+        """
+        self.last_cleanup = timestamp
+        self.flow_tracker.cleanup_old_flows(timestamp)
+        self.prefix_lists.check_reload()
+        if self.profiler is not None:
+            self.profiler.arm()
+
+    def maintain_idle(self):
+        """Ejecutar maintain() con el reloj de pared si ya toca
+
+        Sin tráfico el reloj de los paquetes no avanza: la captura en vivo
+        llama a esto en cada vuelta para que los flujos expiren igualmente.
+        """
+        timestamp = time.time() - self.start_time
+        if timestamp - self.last_cleanup >= CLEANUP_INTERVAL:
+            self.maintain(timestamp)
+
+    def _cached_verdict(self, record, flow):
+        """Reutilizar el cluster memorizado del flujo si sigue siendo válido
+
+        El flujo se reclasifica al cruzar un punto de control geométrico de
+        paquetes (1, 2, 4, 8... con factor 2) o si su tamaño o IAT medio se
+        alejan más de VERDICT_DRIFT_THRESHOLD de los del último veredicto.
+        Un acierto evita calcular las características y pasar por K-Means.
+        El veredicto vive en el FlowRecord, así que desaparece con el flujo;
+        el siguiente punto de control solo avanza al guardar un veredicto
+        (ver _classify_batch).
+        """
+        sizes = flow.packet_sizes
+        if (
+            flow.verdict_cluster is not None
+            and sizes.count < flow.next_verdict
+            and abs(sizes.mean - flow.verdict_size_mean)
+            <= VERDICT_DRIFT_THRESHOLD * flow.verdict_size_mean
+            and abs(flow.inter_arrival_times.mean - flow.verdict_iat_mean)
+            <= VERDICT_DRIFT_THRESHOLD * flow.verdict_iat_mean
+        ):
+            record.cluster = flow.verdict_cluster
+            self.verdict_cache_stats["hits"] += 1
+            return True
+        self.verdict_cache_stats["misses"] += 1
+        return False
+
+    def _on_flow_expired(self, flow_key, flow):
+        """Clasificar por última vez un flujo finalizado"""
+        self.shedder.forget(flow_key)
+        features = self.flow_tracker.compute_features(flow)
+        clasificacion, _ = self.kmeans_classifier.classify(features)
+        if clasificacion is not None:
+            self.expired_flows[clasificacion] += 1
+        if self.store is not None:
+            self.store.add_flow(
+                flow_key,
+                flow,
+                (
+                    UNCLASSIFIED
+                    if clasificacion is None
+                    else Classification.from_label(clasificacion)
+                ),
+                self.start_time,
+            )
+
+    def _classify_batch(self, batch):
+        """Clasificar un lote de paquetes y entregarlos en orden"""
+        # Las listas de prefijos deciden antes que el modelo
+        prefix_lists = self.prefix_lists
+        if prefix_lists.enabled:
+            verdicts = prefix_lists.verdicts(
+                [item[0].src_ip for item in batch],
+                [item[0].dst_ip for item in batch],
+            )
+        else:
+            verdicts = [None] * len(batch)
+
+        # Intentar clasificación con K-Means para el resto de paquetes con flujo
+        features = [
+            item[1]
+            for item, verdict in zip(batch, verdicts)
+            if item[1] is not None and verdict is None
+        ]
+        try:
+            clusters = iter(self.predict_batch(features) if features else [])
+            kmeans_failed = False
+        except Exception:
+            kmeans_failed = True
+
+        # Heurística de respaldo para el resto, en una sola pasada vectorizada
+        # (un paquete sin características pero con cluster trae el veredicto
+        # memorizado de su flujo)
+        fallback = [
+            record
+            for (record, flow_features, _, _), verdict in zip(batch, verdicts)
+            if verdict is None
+            and (kmeans_failed if flow_features is not None else record.cluster < 0)
+        ]
+        heuristic = iter(self._classify_heuristic(fallback) if fallback else [])
+
+        for (record, flow_features, flow_key, flow), verdict in zip(batch, verdicts):
+            if verdict is not None:
+                record.classification = LIST_CLASSIFICATION[verdict]
+                record.method = verdict
+            elif flow_features is not None and not kmeans_failed:
+                cluster = next(clusters)
+                record.cluster = cluster
+                record.classification = CLUSTER_CLASSIFICATION.get(
+                    cluster, Classification.ANOMALO
+                )
+                record.method = Method.KMEANS
+                # Memorizar el veredicto, las medias con que se obtuvo y el
+                # siguiente punto de control (paquetes del flujo x factor)
+                if flow is not None:
+                    flow.verdict_cluster = cluster
+                    flow.verdict_iat_mean = flow_features[3]
+                    flow.verdict_size_mean = flow_features[5]
+                    flow.next_verdict = (
+                        flow_features[1] + flow_features[2]
+                    ) * VERDICT_CHECKPOINT_FACTOR
+            elif flow_features is None and record.cluster >= 0:
+                # Veredicto memorizado del flujo (ver _cached_verdict)
+                record.classification = CLUSTER_CLASSIFICATION.get(
+                    record.cluster, Classification.ANOMALO
+                )
+                record.method = Method.KMEANS
+            else:
+                # Fallback a clasificación heurística
+                record.classification = (
+                    Classification.ANOMALO if next(heuristic) else Classification.NORMAL
+                )
+                record.method = (
+                    Method.HEURISTICA_FALLBACK
+                    if flow_features is None
+                    else Method.HEURISTICA_ERROR_KMEANS
+                )
+
+            # Los flujos anómalos quedan exentos del muestreo
+            if record.classification == Classification.ANOMALO:
+                self.shedder.flag(flow_key)
+            self.classification_counts[record.classification][record.method] += 1
+
+            # Entregar a los suscriptores (GUI, sinks, ...)
+            for callback in self.subscribers:
+                callback(record)
+
+    def _classify_heuristic(self, records):
+        """Lista de bool (True = anómalo) de la heurística para varios paquetes"""
+        return self.simple_classifier.classify_batch(
+            [record.length for record in records],
+            [record.src_port for record in records],
+            [record.dst_port for record in records],
+            [record.protocol for record in records],
+        ).tolist()
+
+
+def decode_frame(frame, linktype=DLT_EN10MB):
+    """Decodificar una trama cruda con el parser rápido (Scapy como respaldo)"""
+    try:
+        return parse_frame(frame, linktype)
+    except UnsupportedFrame:
+        layer = conf.l2types.num2layer.get(linktype, conf.raw_layer)
+        # bytes(): la trama puede ser una vista del anillo mmap
+        return dissect_with_scapy(layer(bytes(frame)))
+
+
+def dissect_with_scapy(packet):
+    """Obtener los campos de un paquete Scapy (ruta lenta de respaldo)"""
+    if IP in packet:
+        ip_layer = packet[IP]
+        ip_proto = ip_layer.proto
+        ip_length = ip_layer.len
+    elif IPv6 in packet:
+        ip_layer = packet[IPv6]
+        ip_proto = ip_layer.nh
+        ip_length = ip_layer.plen + 40
+    else:
+        return None
+
+    # Longitud original aunque la trama venga recortada por el snaplen
+    length = len(packet)
+    if ip_length:
+        length = max(length, length - len(ip_layer) + ip_length)
+
+    if TCP in packet:
+        protocol = 6
+        src_port = packet[TCP].sport
+        dst_port = packet[TCP].dport
+    elif UDP in packet:
+        protocol = 17
+        src_port = packet[UDP].sport
+        dst_port = packet[UDP].dport
+    else:
+        protocol = ip_proto
+        src_port = 0
+        dst_port = 0
+
+    return ip_layer.src, ip_layer.dst, protocol, src_port, dst_port, length
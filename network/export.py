@@ -0,0 +1,138 @@
+"""Exportación en streaming a CSV/JSONL (gzip si el archivo acaba en .gz)
+
+Los registros se escriben por bloques de EXPORT_CHUNK_SIZE filas con los
+sinks de network/sinks.py; el almacén se recorre segmento a segmento, así
+que la memoria no depende del tamaño de la exportación. 'progress' recibe
+la fracción completada (0-1) tras cada bloque y 'cancelled' se consulta
+entre bloques; al cancelar se borra el archivo parcial.
+"""
+
+import os
+
+from config.settings import EXPORT_CHUNK_SIZE
+from network.flow_store import UNCLASSIFIED, decode_rows
+from network.packet_record import Classification, protocol_name
+from network.shm_ring import unpack_records
+from network.sinks import SINKS, RECORD_FIELDS, record_values
+
+# Columnas de un flujo del almacén (mismos nombres que RECORD_FIELDS)
+FLOW_FIELDS = [
+    "inicio",
+    "fin",
+    "ip_origen",
+    "ip_destino",
+    "protocolo",
+    "puerto_origen",
+    "puerto_destino",
+    "bytes",
+    "paquetes_ida",
+    "paquetes_vuelta",
+    "flow_id",
+    "clasificacion",
+]
+
+
+def flow_values(row):
+    """Valores de una fila de decode_rows() en el orden de FLOW_FIELDS"""
+    classification = row["classification"]
+    return (
+        row["start"],
+        row["end"],
+        row["src_ip"],
+        row["dst_ip"],
+        protocol_name(row["protocol"]),
+        row["src_port"],
+        row["dst_port"],
+        row["bytes"],
+        row["fwd_packets"],
+        row["bwd_packets"],
+        row["flow_id"],
+        (
+            "Sin clasificar"
+            if classification == UNCLASSIFIED
+            else Classification(classification).label
+        ),
+    )
+
+
+def format_for_path(path):
+    """Formato ("csv" o "jsonl") según la extensión, ignorando .gz"""
+    base = path[:-3] if path.endswith(".gz") else path
+    return "csv" if base.endswith(".csv") else "jsonl"
+
+
+def export_records(
+    records,
+    path,
+    export_format=None,
+    progress=None,
+    cancelled=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
+):
+    """Exportar una secuencia de PacketRecord; devuelve filas escritas"""
+    sink = SINKS[export_format or format_for_path(path)](path)
+    total = len(records)
+    chunks = (
+        (records[offset : offset + chunk_size], min(offset + chunk_size, total) / total)
+        for offset in range(0, total, chunk_size)
+    )
+    return _write(sink, path, chunks, progress, cancelled)
+
+
+def export_store(
+    store,
+    table,
+    path,
+    export_format=None,
+    start=None,
+    end=None,
+    ip=None,
+    port=None,
+    progress=None,
+    cancelled=None,
+    chunk_size=EXPORT_CHUNK_SIZE,
+):
+    """Exportar filas del almacén ("flows" o "alerts"); devuelve filas escritas
+
+    Las alertas salen con las mismas columnas y textos que export_records
+    (el tiempo es la marca absoluta guardada en el almacén).
+    """
+    if table == "alerts":
+        fields, values, decode = RECORD_FIELDS, record_values, unpack_records
+    else:
+        fields, values, decode = FLOW_FIELDS, flow_values, decode_rows
+    sink = SINKS[export_format or format_for_path(path)](
+        path, fields=fields, values=values
+    )
+    chunks = _store_chunks(store.scan(table, start, end, ip, port), decode, chunk_size)
+    return _write(sink, path, chunks, progress, cancelled)
+
+
+def _store_chunks(scan, decode, chunk_size):
+    """Bloques (filas decodificadas, fracción) a partir de los segmentos de scan()"""
+    done = 0.0
+    for rows, fraction in scan:
+        for offset in range(0, len(rows), chunk_size):
+            end = min(offset + chunk_size, len(rows))
+            yield decode(rows[offset:end]), done + (fraction - done) * end / len(rows)
+        done = fraction
+
+
+def _write(sink, path, chunks, progress, cancelled):
+    """Escribir los bloques; al cancelar se cierra y se borra el archivo parcial"""
+    written = 0
+    try:
+        for rows, fraction in chunks:
+            if cancelled is not None and cancelled():
+                break
+            for row in rows:
+                sink(row)
+            written += len(rows)
+            if progress is not None:
+                progress(fraction)
+        else:
+            return written
+    finally:
+        sink.close()
+    os.remove(path)
+    return 0
@@ -0,0 +1,127 @@
+"""Parser ligero de cabeceras Ethernet/IPv4/IPv6/TCP/UDP desde bytes crudos
+
+Evita construir objetos Scapy en la ruta caliente: solo lee los campos que
+necesita el motor. Las encapsulaciones no soportadas lanzan UnsupportedFrame
+para que el llamador recurra a la disección completa de Scapy.
+"""
+
+import socket
+import struct
+
+# Tipos de enlace (DLT) soportados
+DLT_EN10MB = 1
+DLT_RAW = 101
+DLT_LINUX_SLL = 113
+_RAW_LINKTYPES = (DLT_RAW, 12, 14)
+
+# EtherTypes
+ETH_P_IP = 0x0800
+ETH_P_IPV6 = 0x86DD
+_VLAN_TYPES = (0x8100, 0x88A8, 0x9100)
+
+# Cabeceras de extensión IPv6 de longitud (n + 1) * 8 que se pueden saltar
+_IPV6_EXT_HEADERS = (0, 43, 60)
+_IPV6_FRAGMENT = 44
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+_unpack_ports = struct.Struct("!HH").unpack_from
+_inet_ntoa = socket.inet_ntoa
+_inet_ntop = socket.inet_ntop
+_AF_INET6 = socket.AF_INET6
+
+
+class UnsupportedFrame(ValueError):
+    """Trama que el parser rápido no sabe decodificar (usar Scapy)"""
+
+
+def parse_frame(frame, linktype=DLT_EN10MB):
+    """Extraer (src_ip, dst_ip, protocol, src_port, dst_port, length)
+
+    Devuelve None si la trama no transporta IP. 'protocol' es el número de
+    protocolo IP de la capa de transporte (6 = TCP, 17 = UDP, ...). Con
+    snaplen la trama llega recortada: 'length' sale de la cabecera IP.
+    """
+    if linktype == DLT_EN10MB:
+        if len(frame) < 14:
+            raise UnsupportedFrame("Ethernet truncado")
+        ethertype = (frame[12] << 8) | frame[13]
+        offset = 14
+        while ethertype in _VLAN_TYPES:
+            if len(frame) < offset + 4:
+                raise UnsupportedFrame("VLAN truncada")
+            ethertype = (frame[offset + 2] << 8) | frame[offset + 3]
+            offset += 4
+    elif linktype in _RAW_LINKTYPES:
+        if not frame:
+            raise UnsupportedFrame("trama vacía")
+        version = frame[0] >> 4
+        ethertype = ETH_P_IP if version == 4 else ETH_P_IPV6 if version == 6 else 0
+        offset = 0
+    elif linktype == DLT_LINUX_SLL:
+        if len(frame) < 16:
+            raise UnsupportedFrame("SLL truncado")
+        ethertype = (frame[14] << 8) | frame[15]
+        offset = 16
+    else:
+        raise UnsupportedFrame(f"linktype {linktype} no soportado")
+
+    if ethertype == ETH_P_IP:
+        return _parse_ipv4(frame, offset)
+    if ethertype == ETH_P_IPV6:
+        return _parse_ipv6(frame, offset)
+    return None
+
+
+def _parse_ipv4(frame, offset):
+    if len(frame) < offset + 20:
+        raise UnsupportedFrame("IPv4 truncado")
+
+    ihl = (frame[offset] & 0x0F) * 4
+    if ihl < 20:
+        raise UnsupportedFrame("IHL inválido")
+    proto = frame[offset + 9]
+    src_ip = _inet_ntoa(frame[offset + 12 : offset + 16])
+    dst_ip = _inet_ntoa(frame[offset + 16 : offset + 20])
+    # Longitud original aunque la trama venga recortada (el relleno la alarga)
+    length = max(len(frame), offset + ((frame[offset + 2] << 8) | frame[offset + 3]))
+
+    # Fragmentos no iniciales no llevan cabecera de transporte
+    fragment_offset = ((frame[offset + 6] & 0x1F) << 8) | frame[offset + 7]
+    if fragment_offset:
+        return src_ip, dst_ip, proto, 0, 0, length
+
+    return _parse_transport(frame, offset + ihl, proto, src_ip, dst_ip, length)
+
+
+def _parse_ipv6(frame, offset):
+    if len(frame) < offset + 40:
+        raise UnsupportedFrame("IPv6 truncado")
+
+    next_header = frame[offset + 6]
+    src_ip = _inet_ntop(_AF_INET6, frame[offset + 8 : offset + 24])
+    dst_ip = _inet_ntop(_AF_INET6, frame[offset + 24 : offset + 40])
+    payload_length = (frame[offset + 4] << 8) | frame[offset + 5]
+    offset += 40
+    length = max(len(frame), offset + payload_length)
+
+    while next_header in _IPV6_EXT_HEADERS:
+        if len(frame) < offset + 2:
+            raise UnsupportedFrame("extensión IPv6 truncada")
+        next_header, header_length = frame[offset], (frame[offset + 1] + 1) * 8
+        offset += header_length
+    if next_header == _IPV6_FRAGMENT:
+        raise UnsupportedFrame("fragmento IPv6")
+
+    return _parse_transport(frame, offset, next_header, src_ip, dst_ip, length)
+
+
+def _parse_transport(frame, offset, proto, src_ip, dst_ip, length):
+    if proto == IPPROTO_TCP or proto == IPPROTO_UDP:
+        if len(frame) < offset + 4:
+            raise UnsupportedFrame("cabecera de transporte truncada")
+        src_port, dst_port = _unpack_ports(frame, offset)
+        return src_ip, dst_ip, proto, src_port, dst_port, length
+
+    return src_ip, dst_ip, proto, 0, 0, length
@@ -0,0 +1,314 @@
+"""Almacén persistente de flujos finalizados y alertas, columnar y por tiempo
+
+Estructura en disco:
+
+    <raíz>/store.json                      duración de partición (fija al crear)
+    <raíz>/<tabla>/<AAAAMMDDTHHMMSS>/      una partición por intervalo (UTC)
+    <raíz>/<tabla>/<partición>/<t0>_<t1>_<pid>_<n>.npz   segmento inmutable
+
+Cada segmento es un .npz sin comprimir con un array por columna, así que
+una consulta solo lee las columnas que filtra o devuelve. Los segmentos se
+escriben una vez y nunca se modifican (solo se añaden). Las consultas
+descartan particiones y segmentos por tiempo sin abrirlos: el nombre de la
+partición fija su intervalo y el del segmento lleva sus marcas mínima y
+máxima (microsegundos).
+
+La captura solo hace un append a un deque; la conversión a columnas y la
+escritura ocurren en un hilo escritor por lotes.
+"""
+
+import calendar
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from config.settings import (
+    STORE_PATH,
+    STORE_FLUSH_INTERVAL,
+    STORE_BATCH_SIZE,
+    STORE_PARTITION_SECONDS,
+)
+from network.shm_ring import RECORD_DTYPE, flow_id, pack_record, pack_ip, unpack_ip
+
+# Clasificación de un flujo que el modelo no pudo clasificar
+UNCLASSIFIED = 255
+
+FLOW_DTYPE = np.dtype(
+    [
+        ("start", "<f8"),
+        ("end", "<f8"),
+        ("src_ip", "S16"),
+        ("dst_ip", "S16"),
+        ("bytes", "<u8"),
+        ("fwd_packets", "<u4"),
+        ("bwd_packets", "<u4"),
+        ("flow_id", "<u4"),
+        ("src_port", "<u2"),
+        ("dst_port", "<u2"),
+        ("protocol", "u1"),
+        ("ip_version", "u1"),
+        ("classification", "u1"),
+    ]
+)
+
+# Alertas: mismo registro que el transporte entre procesos (marca absoluta)
+ALERT_DTYPE = RECORD_DTYPE
+
+# Tabla -> (dtype, columna de tiempo)
+TABLES = {
+    "flows": (FLOW_DTYPE, "start"),
+    "alerts": (ALERT_DTYPE, "timestamp"),
+}
+
+_PARTITION_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class FlowStore:
+    """Escritor en segundo plano y API de consulta del almacén"""
+
+    def __init__(
+        self,
+        root=STORE_PATH,
+        flush_interval=STORE_FLUSH_INTERVAL,
+        batch_size=STORE_BATCH_SIZE,
+        partition_seconds=STORE_PARTITION_SECONDS,
+    ):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.partition_seconds = self._load_layout(partition_seconds)
+
+        # Pendientes de escribir por tabla (append/popleft son atómicos)
+        self.pending = {table: deque() for table in TABLES}
+        self.written = {table: 0 for table in TABLES}
+        self._sequence = itertools.count()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._running = False
+        self._writer_thread = None
+
+    def _load_layout(self, partition_seconds):
+        """Leer (o fijar al crear) la duración de partición del almacén"""
+        layout_path = os.path.join(self.root, "store.json")
+        if os.path.exists(layout_path):
+            with open(layout_path, encoding="utf-8") as handle:
+                return json.load(handle)["partition_seconds"]
+        os.makedirs(self.root, exist_ok=True)
+        with open(layout_path, "w", encoding="utf-8") as handle:
+            json.dump({"version": 1, "partition_seconds": partition_seconds}, handle)
+        return partition_seconds
+
+    # -- Escritura ---------------------------------------------------------
+
+    def add_flow(self, flow_key, flow, classification, base_time):
+        """Encolar un flujo finalizado (tiempos del flujo relativos a base_time)"""
+        queue = self.pending["flows"]
+        queue.append((flow_key, flow, classification, base_time))
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def add_alert(self, record, base_time):
+        """Encolar un paquete anómalo (record.timestamp relativo a base_time)"""
+        queue = self.pending["alerts"]
+        queue.append((record, base_time))
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """Iniciar el hilo escritor"""
+        if self._running:
+            return
+        self._running = True
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+    def stop(self):
+        """Detener el hilo escritor y escribir lo pendiente"""
+        self._running = False
+        self._wakeup.set()
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+            self._writer_thread = None
+        self.flush()
+
+    def flush(self):
+        """Escribir ahora todo lo pendiente"""
+        with self._write_lock:
+            for table in TABLES:
+                self._write_pending(table)
+
+    def _writer_loop(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] Error escribiendo en el almacén: {e}")
+
+    def _write_pending(self, table):
+        queue = self.pending[table]
+        popleft = queue.popleft
+        items = [popleft() for _ in range(len(queue))]
+        if not items:
+            return
+
+        if table == "flows":
+            rows = [_flow_row(*item) for item in items]
+        else:
+            rows = [_alert_row(*item) for item in items]
+        dtype, time_column = TABLES[table]
+        array = np.array(rows, dtype=dtype)
+
+        # Un segmento por partición tocada por el lote
+        partitions = (array[time_column] // self.partition_seconds).astype(np.int64)
+        for partition in np.unique(partitions):
+            self._write_segment(
+                table, int(partition), array[partitions == partition], time_column
+            )
+        self.written[table] += len(array)
+
+    def _write_segment(self, table, partition, array, time_column):
+        directory = os.path.join(
+            self.root, table, self._partition_name(partition * self.partition_seconds)
+        )
+        os.makedirs(directory, exist_ok=True)
+        times = array[time_column]
+        name = (
+            f"{int(times.min() * 1e6)}_{int(times.max() * 1e6) + 1}_"
+            f"{os.getpid()}_{next(self._sequence)}"
+        )
+        temporary = os.path.join(directory, name + ".tmp")
+        with open(temporary, "wb") as handle:
+            np.savez(handle, **{column: array[column] for column in array.dtype.names})
+        # Los lectores nunca ven un segmento a medio escribir
+        os.replace(temporary, os.path.join(directory, name + ".npz"))
+
+    @staticmethod
+    def _partition_name(start):
+        return time.strftime(_PARTITION_FORMAT, time.gmtime(start))
+
+    # -- Consulta ----------------------------------------------------------
+
+    def query(self, table, start=None, end=None, ip=None, port=None, limit=None):
+        """Filas de 'table' en [start, end] (epoch) con la IP/puerto en cualquier extremo
+
+        Devuelve un array estructurado ordenado por tiempo (ver decode_rows).
+        Solo se abren los segmentos cuyo intervalo se solapa con el pedido.
+        """
+        dtype, time_column = TABLES[table]
+        matches = [rows for rows, _ in self.scan(table, start, end, ip, port)]
+        if not matches:
+            return np.empty(0, dtype=dtype)
+        result = np.concatenate(matches)
+        result = result[np.argsort(result[time_column], kind="stable")]
+        return result[:limit] if limit else result
+
+    def scan(self, table, start=None, end=None, ip=None, port=None):
+        """Iterar (filas, fracción recorrida) segmento a segmento, sin acumular
+
+        Para exportaciones grandes: la memoria queda acotada por un segmento.
+        El orden es el de los segmentos, no un orden global por tiempo.
+        """
+        dtype, time_column = TABLES[table]
+        packed_ip = pack_ip(ip)[0] if ip else None
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+
+        paths = self._segments(table, start, end)
+        for index, path in enumerate(paths, 1):
+            with np.load(path) as segment:
+                # Filtrar primero por las columnas baratas y cargar el resto al final
+                mask = (segment[time_column] >= start) & (segment[time_column] <= end)
+                if port is not None:
+                    mask &= (segment["src_port"] == port) | (
+                        segment["dst_port"] == port
+                    )
+                if packed_ip is not None:
+                    mask &= (segment["src_ip"] == packed_ip) | (
+                        segment["dst_ip"] == packed_ip
+                    )
+                if not mask.any():
+                    continue
+                rows = np.empty(int(mask.sum()), dtype=dtype)
+                for column in dtype.names:
+                    rows[column] = segment[column][mask]
+            yield rows, index / len(paths)
+
+    def _segments(self, table, start, end):
+        """Segmentos que pueden contener filas en [start, end]"""
+        table_dir = os.path.join(self.root, table)
+        if not os.path.isdir(table_dir):
+            return []
+        paths = []
+        for partition in sorted(os.listdir(table_dir)):
+            try:
+                partition_start = calendar.timegm(
+                    time.strptime(partition, _PARTITION_FORMAT)
+                )
+            except ValueError:
+                continue
+            if (
+                partition_start > end
+                or partition_start + self.partition_seconds <= start
+            ):
+                continue
+            directory = os.path.join(table_dir, partition)
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".npz"):
+                    continue
+                first, last = name.split("_")[:2]
+                if int(first) / 1e6 > end or int(last) / 1e6 < start:
+                    continue
+                paths.append(os.path.join(directory, name))
+        return paths
+
+
+def decode_rows(array):
+    """Filas de query() como diccionarios con las IPs en texto"""
+    names = array.dtype.names
+    rows = []
+    for row in array.tolist():
+        values = dict(zip(names, row))
+        version = values.pop("ip_version")
+        values["src_ip"] = unpack_ip(values["src_ip"], version)
+        values["dst_ip"] = unpack_ip(values["dst_ip"], version)
+        rows.append(values)
+    return rows
+
+
+def _flow_row(flow_key, flow, classification, base_time):
+    """Fila de FLOW_DTYPE; el origen es quien inició el flujo"""
+    low_ip, low_port, high_ip, high_port, protocol = flow_key
+    if flow.initiator_low:
+        src_ip, src_port, dst_ip, dst_port = low_ip, low_port, high_ip, high_port
+    else:
+        src_ip, src_port, dst_ip, dst_port = high_ip, high_port, low_ip, low_port
+    src, version = pack_ip(src_ip)
+    dst, _ = pack_ip(dst_ip)
+    return (
+        base_time + flow.start_time,
+        base_time + flow.last_seen,
+        src,
+        dst,
+        int(flow.packet_sizes.total),
+        flow.fwd_packets,
+        flow.bwd_packets,
+        flow_id(src, dst, src_port, dst_port, protocol),
+        src_port,
+        dst_port,
+        protocol,
+        version,
+        classification,
+    )
+
+
+def _alert_row(record, base_time):
+    """Fila de ALERT_DTYPE con la marca de tiempo absoluta"""
+    row = pack_record(record)
+    return (row[0], base_time + row[1]) + row[2:]
@@ -1,102 +1,184 @@
 """Seguimiento y análisis de flujos de red"""
 
-import statistics
-from collections import defaultdict
+import math
+from collections import OrderedDict, deque
+
+from config.settings import FLOW_HISTORY_SIZE, FLOW_TIMEOUT
+
+
+class RunningStats:
+    """Acumulador incremental (Welford) de media, desviación, mínimo y máximo"""
+
+    __slots__ = ("count", "total", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Incorporar un nuevo valor en O(1)"""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def stdev(self):
+        """Desviación estándar muestral (equivalente a statistics.stdev)"""
+        if self.count < 2:
+            return 0
+        return math.sqrt(max(0.0, self.m2 / (self.count - 1)))
+
+
+class FlowRecord:
+    """Estado compacto de un flujo: solo los agregados que necesita el modelo"""
+
+    __slots__ = (
+        "start_time",
+        "last_seen",
+        "fwd_packets",
+        "bwd_packets",
+        "initiator_low",
+        "packet_sizes",
+        "inter_arrival_times",
+        "recent_packets",
+        "verdict_cluster",
+        "verdict_size_mean",
+        "verdict_iat_mean",
+        "next_verdict",
+    )
+
+    def __init__(self, timestamp, initiator_low=True, history_size=0):
+        self.start_time = timestamp
+        self.last_seen = timestamp
+        self.fwd_packets = 0
+        self.bwd_packets = 0
+        # Dirección "forward" = la del primer paquete (quien inicia el flujo)
+        self.initiator_low = initiator_low
+        self.packet_sizes = RunningStats()
+        self.inter_arrival_times = RunningStats()
+        # Buffer circular opcional de paquetes recientes (vista forense)
+        self.recent_packets = deque(maxlen=history_size) if history_size else None
+        # Último veredicto de K-Means y medias con que se obtuvo (caché del motor)
+        self.verdict_cluster = None
+        self.verdict_size_mean = 0.0
+        self.verdict_iat_mean = 0.0
+        self.next_verdict = 0
+
+    @property
+    def packet_count(self):
+        return self.packet_sizes.count
 
 
 class FlowTracker:
     """Clase para rastrear y calcular estadísticas de flujos de red"""
 
-    def __init__(self, flow_timeout=60):
-        self.flows = defaultdict(
-            lambda: {
-                "packets": [],
-                "start_time": None,
-                "last_seen": None,
-                "fwd_packets": 0,
-                "bwd_packets": 0,
-                "packet_sizes": [],
-                "inter_arrival_times": [],
-            }
-        )
+    def __init__(self, flow_timeout=FLOW_TIMEOUT, history_size=FLOW_HISTORY_SIZE):
+        # Ordenado por last_seen: el flujo más antiguo siempre está al inicio
+        self.flows = OrderedDict()
         self.flow_timeout = flow_timeout
+        self.history_size = history_size
+        self.expiry_callbacks = []
+        # Contadores acumulados (métricas)
+        self.flows_created = 0
+        self.flows_expired = 0
 
     def get_flow_key(self, src_ip, dst_ip, src_port, dst_port, protocol):
-        """Generar clave única para el flujo"""
-        return f"{src_ip}:{src_port}-{dst_ip}:{dst_port}-{protocol}"
+        """Generar clave bidireccional canónica (extremo menor primero)"""
+        if src_ip < dst_ip or (src_ip == dst_ip and src_port <= dst_port):
+            return (src_ip, src_port, dst_ip, dst_port, protocol)
+        return (dst_ip, dst_port, src_ip, src_port, protocol)
 
     def add_packet(
         self, src_ip, dst_ip, src_port, dst_port, protocol, packet_size, timestamp
     ):
-        """Agregar paquete al flujo correspondiente"""
-        flow_key = self.get_flow_key(src_ip, dst_ip, src_port, dst_port, protocol)
-        flow = self.flows[flow_key]
+        """Agregar paquete al flujo correspondiente (ambas direcciones)"""
+        src_is_low = src_ip < dst_ip or (src_ip == dst_ip and src_port <= dst_port)
+        if src_is_low:
+            flow_key = (src_ip, src_port, dst_ip, dst_port, protocol)
+        else:
+            flow_key = (dst_ip, dst_port, src_ip, src_port, protocol)
+
+        flow = self.flows.get(flow_key)
 
-        if flow["start_time"] is None:
-            flow["start_time"] = timestamp
-            flow["fwd_packets"] = 1
+        if flow is None:
+            flow = FlowRecord(timestamp, src_is_low, self.history_size)
+            self.flows[flow_key] = flow
+            self.flows_created += 1
         else:
-            if flow["last_seen"] is not None:
-                iat = timestamp - flow["last_seen"]
-                flow["inter_arrival_times"].append(iat)
-            flow["fwd_packets"] += 1
+            flow.inter_arrival_times.add(timestamp - flow.last_seen)
+            self.flows.move_to_end(flow_key)
+
+        if src_is_low == flow.initiator_low:
+            flow.fwd_packets += 1
+        else:
+            flow.bwd_packets += 1
+
+        flow.last_seen = timestamp
+        flow.packet_sizes.add(packet_size)
 
-        flow["last_seen"] = timestamp
-        flow["packets"].append(
-            {"timestamp": timestamp, "size": packet_size, "src": src_ip, "dst": dst_ip}
-        )
-        flow["packet_sizes"].append(packet_size)
+        if flow.recent_packets is not None:
+            flow.recent_packets.append((timestamp, packet_size, src_ip, dst_ip))
 
         return flow_key
 
+    def get_recent_packets(self, flow_key):
+        """Obtener los últimos paquetes guardados de un flujo (si hay historial)"""
+        flow = self.flows.get(flow_key)
+        if flow is None or flow.recent_packets is None:
+            return []
+        return list(flow.recent_packets)
+
     def calculate_flow_features(self, flow_key, use_defaults=True):
-        """Calcular características del flujo para el modelo"""
-        if flow_key not in self.flows:
+        """Calcular características del flujo para el modelo (O(1) por llamada)"""
+        flow = self.flows.get(flow_key)
+        if flow is None:
             return None
 
-        flow = self.flows[flow_key]
+        return self.compute_features(flow, use_defaults)
+
+    def compute_features(self, flow, use_defaults=True):
+        """Calcular el vector de características a partir de un FlowRecord"""
+        sizes = flow.packet_sizes
+        iats = flow.inter_arrival_times
+        packet_count = sizes.count
 
-        if len(flow["packets"]) < 2 and not use_defaults:
+        if packet_count < 2 and not use_defaults:
             return None
 
         # Calcular características del flujo
-        flow_duration = (
-            flow["last_seen"] - flow["start_time"]
-            if len(flow["packets"]) >= 2
-            else 0.001
-        )
+        flow_duration = flow.last_seen - flow.start_time if packet_count >= 2 else 0.001
 
-        total_fwd_packets = flow["fwd_packets"]
-        total_bwd_packets = max(0, len(flow["packets"]) - flow["fwd_packets"])
+        total_fwd_packets = flow.fwd_packets
+        total_bwd_packets = flow.bwd_packets
 
         # IAT estadísticas
-        if len(flow["inter_arrival_times"]) > 0:
-            flow_iat_mean = statistics.mean(flow["inter_arrival_times"])
-            flow_iat_std = (
-                statistics.stdev(flow["inter_arrival_times"])
-                if len(flow["inter_arrival_times"]) > 1
-                else 0
-            )
+        if iats.count > 0:
+            flow_iat_mean = iats.mean
+            flow_iat_std = iats.stdev()
         else:
             flow_iat_mean = 0.0
             flow_iat_std = 0.0
 
         # Packet length estadísticas
-        if len(flow["packet_sizes"]) > 0:
-            packet_length_mean = statistics.mean(flow["packet_sizes"])
-            packet_length_std = (
-                statistics.stdev(flow["packet_sizes"])
-                if len(flow["packet_sizes"]) > 1
-                else 0
-            )
+        if packet_count > 0:
+            packet_length_mean = sizes.mean
+            packet_length_std = sizes.stdev()
         else:
             packet_length_mean = 0
             packet_length_std = 0
 
         # Flow packets/s
-        flow_packets_per_sec = (
-            len(flow["packets"]) / flow_duration if flow_duration > 0 else 0
-        )
+        flow_packets_per_sec = packet_count / flow_duration if flow_duration > 0 else 0
 
         return [
             flow_duration,
@@ -109,13 +191,38 @@ class FlowTracker:
             flow_packets_per_sec,
         ]
 
-    def cleanup_old_flows(self, current_time):
-        """Limpiar flujos antiguos"""
-        to_remove = [
-            flow_key
-            for flow_key, flow in self.flows.items()
-            if current_time - flow["last_seen"] > self.flow_timeout
-        ]
+    def add_expiry_callback(self, callback):
+        """Registrar callback(flow_key, flow) llamado al expirar cada flujo"""
+        self.expiry_callbacks.append(callback)
 
-        for flow_key in to_remove:
-            del self.flows[flow_key]
+    def cleanup_old_flows(self, current_time):
+        """Expirar flujos inactivos en O(flujos expirados)"""
+        expired = []
+        flows = self.flows
+
+        while flows:
+            flow_key, flow = next(iter(flows.items()))
+            if current_time - flow.last_seen <= self.flow_timeout:
+                break
+            flows.popitem(last=False)
+            expired.append((flow_key, flow))
+
+        self._notify_expired(expired)
+        return len(expired)
+
+    def flush(self):
+        """Expirar todos los flujos activos (p. ej. al detener la captura)"""
+        expired = list(self.flows.items())
+        self.flows.clear()
+        self._notify_expired(expired)
+        return len(expired)
+
+    def _notify_expired(self, expired):
+        """Entregar los flujos expirados a los callbacks registrados"""
+        self.flows_expired += len(expired)
+        for callback in self.expiry_callbacks:
+            for flow_key, flow in expired:
+                try:
+                    callback(flow_key, flow)
+                except Exception as e:
+                    print(f"[ERROR] Error en callback de expiración: {e}")
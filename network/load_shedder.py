@@ -0,0 +1,104 @@
+"""Muestreo por flujo y descarte de carga cuando la captura no da abasto
+
+Se muestrea por flujo (1 de cada N, decidido por un CRC32 de la clave,
+igual en todos los procesos y ejecuciones), no por paquete, para que los flujos que se procesan conserven estadísticas
+completas. Los flujos nuevos y los ya marcados como anómalos se procesan
+siempre. En modo "adaptive" N se duplica o se reduce a la mitad según el
+retraso medido entre la captura del paquete y su procesamiento.
+"""
+
+import time
+import zlib
+
+from config.settings import (
+    LOAD_SHED_MODE,
+    LOAD_SHED_SAMPLE_RATE,
+    LOAD_SHED_MAX_RATE,
+    LOAD_SHED_TARGET_LAG,
+    LOAD_SHED_ADAPT_INTERVAL,
+)
+
+
+class LoadShedder:
+    """Decide qué paquetes se procesan y cuenta los descartados"""
+
+    def __init__(
+        self,
+        mode=LOAD_SHED_MODE,
+        sample_rate=LOAD_SHED_SAMPLE_RATE,
+        max_rate=LOAD_SHED_MAX_RATE,
+        target_lag=LOAD_SHED_TARGET_LAG,
+        adapt_interval=LOAD_SHED_ADAPT_INTERVAL,
+    ):
+        self.mode = mode
+        # Potencias de 2: al subir N los flujos muestreados son un subconjunto
+        self.sample_rate = 1 if mode == "off" else _power_of_two(sample_rate)
+        self.max_rate = _power_of_two(max_rate)
+        self.target_lag = target_lag
+        self.adapt_interval = adapt_interval
+
+        self.flagged_flows = set()
+        # CRC32 de cada flujo ya visto al muestrear (se calcula una vez)
+        self.flow_hashes = {}
+        self.shed_packets = 0
+        self.max_lag = 0.0
+        self.last_adapt = time.monotonic()
+
+    def admit(self, flow_key, is_new_flow):
+        """True si el paquete del flujo 'flow_key' debe procesarse"""
+        if (
+            self.sample_rate == 1
+            or is_new_flow
+            or flow_key in self.flagged_flows
+            or self._flow_hash(flow_key) % self.sample_rate == 0
+        ):
+            return True
+        self.shed_packets += 1
+        return False
+
+    def _flow_hash(self, flow_key):
+        """Hash estable del flujo (hash() varía entre procesos con PYTHONHASHSEED)"""
+        value = self.flow_hashes.get(flow_key)
+        if value is None:
+            value = zlib.crc32(repr(flow_key).encode())
+            self.flow_hashes[flow_key] = value
+        return value
+
+    def flag(self, flow_key):
+        """Marcar un flujo clasificado como anómalo (no se muestrea)"""
+        self.flagged_flows.add(flow_key)
+
+    def forget(self, flow_key):
+        """Olvidar un flujo expirado"""
+        self.flagged_flows.discard(flow_key)
+        self.flow_hashes.pop(flow_key, None)
+
+    def observe_lag(self, lag):
+        """Registrar el retraso de captura y ajustar N en modo adaptativo"""
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+        now = time.monotonic()
+        if self.mode != "adaptive" or now - self.last_adapt < self.adapt_interval:
+            return
+        self.last_adapt = now
+
+        if self.max_lag > self.target_lag:
+            self.sample_rate = min(self.sample_rate * 2, self.max_rate)
+        elif self.max_lag < self.target_lag / 4 and self.sample_rate > 1:
+            self.sample_rate //= 2
+        self.max_lag = 0.0
+
+    def get_statistics(self):
+        """Contadores para escalar las estadísticas mostradas"""
+        return {
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "shed_packets": self.shed_packets,
+            "flagged_flows": len(self.flagged_flows),
+        }
+
+
+def _power_of_two(value):
+    """Menor potencia de 2 mayor o igual que value (mínimo 1)"""
+    return 1 << max(int(value) - 1, 0).bit_length()
@@ -0,0 +1,203 @@
+"""Exportador de métricas en formato de texto de Prometheus
+
+El motor solo incrementa contadores enteros en su camino caliente (sin
+locks ni formateo); el texto se genera al recibir cada petición HTTP,
+leyendo esos contadores desde el hilo del servidor. Sirve tanto para
+DetectionEngine como para ShardedPipeline (las métricas de flujos, muestreo,
+caché de veredictos y latencias solo existen en el motor de un proceso).
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.settings import METRICS_HOST, METRICS_PORT
+from network.packet_record import Classification, Method
+
+PREFIX = "anomaly_detector"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Etiquetas estables (independientes de los textos de la GUI)
+CLASS_LABELS = {Classification.NORMAL: "normal", Classification.ANOMALO: "anomalous"}
+METHOD_LABELS = {
+    Method.KMEANS: "kmeans",
+    Method.HEURISTICA_FALLBACK: "heuristic_fallback",
+    Method.HEURISTICA_ERROR_KMEANS: "heuristic_kmeans_error",
+    Method.LISTA_PERMITIDA: "allowlist",
+    Method.LISTA_VIGILANCIA: "watchlist",
+}
+
+# Límites de los histogramas de latencia (segundos)
+LATENCY_BUCKETS = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+)
+
+
+class MetricsExporter:
+    """Servidor HTTP local que publica las métricas de un motor en /metrics"""
+
+    def __init__(self, source, host=METRICS_HOST, port=METRICS_PORT):
+        self.source = source
+        self.server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def start(self):
+        """Atender peticiones en un hilo de fondo"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.address[:2]
+        print(f"[INFO] Métricas en http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def render(self):
+        """Texto de exposición con el estado actual del motor"""
+        source = self.source
+        lines = []
+
+        _metric(lines, "packets_processed_total", "counter", "Paquetes procesados")
+        lines.append(f"{PREFIX}_packets_processed_total {source.packet_count}")
+
+        _metric(
+            lines,
+            "classifications_total",
+            "counter",
+            "Paquetes clasificados por clase y método",
+        )
+        for classification, class_label in CLASS_LABELS.items():
+            counts = source.classification_counts[classification]
+            for method, method_label in METHOD_LABELS.items():
+                lines.append(
+                    f'{PREFIX}_classifications_total{{class="{class_label}",'
+                    f'method="{method_label}"}} {counts[method]}'
+                )
+
+        _metric(
+            lines,
+            "capture_received_total",
+            "counter",
+            "Tramas vistas por el kernel (incluye descartadas)",
+        )
+        lines.append(
+            f"{PREFIX}_capture_received_total {source.capture_stats['received']}"
+        )
+        _metric(
+            lines,
+            "capture_dropped_total",
+            "counter",
+            "Tramas descartadas por el kernel (buffer lleno)",
+        )
+        lines.append(
+            f"{PREFIX}_capture_dropped_total {source.capture_stats['dropped']}"
+        )
+
+        flow_tracker = getattr(source, "flow_tracker", None)
+        if flow_tracker is not None:
+            _metric(lines, "flows_active", "gauge", "Flujos en la tabla")
+            lines.append(f"{PREFIX}_flows_active {len(flow_tracker.flows)}")
+            _metric(lines, "flows_created_total", "counter", "Flujos creados")
+            lines.append(f"{PREFIX}_flows_created_total {flow_tracker.flows_created}")
+            _metric(lines, "flows_expired_total", "counter", "Flujos expirados")
+            lines.append(f"{PREFIX}_flows_expired_total {flow_tracker.flows_expired}")
+
+        shedder = getattr(source, "shedder", None)
+        if shedder is not None:
+            _metric(
+                lines,
+                "shed_packets_total",
+                "counter",
+                "Paquetes omitidos por el muestreo bajo sobrecarga",
+            )
+            lines.append(f"{PREFIX}_shed_packets_total {shedder.shed_packets}")
+            _metric(lines, "sample_rate", "gauge", "Muestreo de flujos actual (1 de N)")
+            lines.append(f"{PREFIX}_sample_rate {shedder.sample_rate}")
+
+        verdict_cache_stats = getattr(source, "verdict_cache_stats", None)
+        if verdict_cache_stats is not None:
+            _metric(
+                lines,
+                "verdict_cache_hits_total",
+                "counter",
+                "Paquetes clasificados con el veredicto memorizado de su flujo",
+            )
+            lines.append(
+                f"{PREFIX}_verdict_cache_hits_total {verdict_cache_stats['hits']}"
+            )
+            _metric(
+                lines,
+                "verdict_cache_misses_total",
+                "counter",
+                "Paquetes que recalcularon características y pasaron por K-Means",
+            )
+            lines.append(
+                f"{PREFIX}_verdict_cache_misses_total {verdict_cache_stats['misses']}"
+            )
+
+        profiler = getattr(source, "profiler", None)
+        if profiler is not None:
+            _render_latencies(lines, profiler)
+
+        return "\n".join(lines) + "\n"
+
+
+def _metric(lines, name, kind, help_text):
+    lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+    lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+
+def _render_latencies(lines, profiler):
+    """Histogramas por etapa (solo las llamadas cronometradas en ventanas)"""
+    name = f"{PREFIX}_stage_latency_seconds"
+    _metric(
+        lines,
+        "stage_latency_seconds",
+        "histogram",
+        "Latencia por etapa (muestras de las ventanas de perfilado)",
+    )
+    bounds = [round(bound * 1e9) for bound in LATENCY_BUCKETS]
+    for stage, histogram in list(profiler.histograms.items()):
+        for bound, count in zip(LATENCY_BUCKETS, histogram.cumulative(bounds)):
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.total}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum / 1e9:.9f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {histogram.total}')
+
+
+def _handler_for(exporter):
+    """Clase de manejador HTTP ligada a un exportador"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = exporter.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Sin una línea en consola por cada scrape
+            pass
+
+    return MetricsHandler
@@ -0,0 +1,81 @@
+"""Agrupación de paquetes en micro-lotes para clasificación"""
+
+import threading
+import time
+
+from config.settings import MICRO_BATCH_SIZE, MICRO_BATCH_MAX_DELAY
+
+
+class MicroBatcher:
+    """Acumula elementos y los entrega en lotes por tamaño o plazo máximo"""
+
+    def __init__(
+        self,
+        flush_callback,
+        batch_size=MICRO_BATCH_SIZE,
+        max_delay=MICRO_BATCH_MAX_DELAY,
+    ):
+        self.flush_callback = flush_callback
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        self.items = []
+        self.first_item_time = 0.0
+        self.lock = threading.Lock()
+        self._running = False
+        self._timer_thread = None
+
+    def add(self, item):
+        """Agregar elemento y vaciar el lote si está lleno o vencido"""
+        with self.lock:
+            if not self.items:
+                self.first_item_time = time.monotonic()
+            self.items.append(item)
+
+            if (
+                len(self.items) >= self.batch_size
+                or time.monotonic() - self.first_item_time >= self.max_delay
+            ):
+                self._flush_locked()
+
+    def poll(self):
+        """Vaciar el lote pendiente si superó el plazo máximo"""
+        with self.lock:
+            if self.items and time.monotonic() - self.first_item_time >= self.max_delay:
+                self._flush_locked()
+
+    def flush(self):
+        """Vaciar el lote pendiente inmediatamente"""
+        with self.lock:
+            if self.items:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        """Entregar el lote actual (llamar con el lock tomado)"""
+        batch = self.items
+        self.items = []
+        try:
+            self.flush_callback(batch)
+        except Exception as e:
+            print(f"[ERROR] Error procesando lote: {e}")
+
+    def start(self):
+        """Iniciar temporizador que garantiza el plazo sin tráfico entrante"""
+        if self._running:
+            return
+        self._running = True
+        self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
+        self._timer_thread.start()
+
+    def stop(self):
+        """Detener temporizador y vaciar lo pendiente"""
+        self._running = False
+        if self._timer_thread is not None:
+            self._timer_thread.join()
+            self._timer_thread = None
+        self.flush()
+
+    def _timer_loop(self):
+        while self._running:
+            time.sleep(self.max_delay)
+            self.poll()
@@ -0,0 +1,125 @@
+"""Registro compacto de paquete que viaja de la captura a la GUI"""
+
+from enum import IntEnum
+
+# Nombres de protocolos IP conocidos (el resto se muestra como número)
+PROTOCOL_NAMES = {6: "TCP", 17: "UDP"}
+
+
+def protocol_name(protocol):
+    """Nombre de un protocolo IP ("TCP", "UDP" o el número en texto)"""
+    return PROTOCOL_NAMES.get(protocol) or str(protocol)
+
+
+class Classification(IntEnum):
+    """Resultado de la clasificación de un paquete"""
+
+    NORMAL = 0
+    ANOMALO = 1
+
+    @property
+    def label(self):
+        return _CLASSIFICATION_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label):
+        """Convertir la etiqueta de CLUSTER_MAPPING ("Normal"/"Anómalo")"""
+        return cls.NORMAL if label == "Normal" else cls.ANOMALO
+
+
+_CLASSIFICATION_LABELS = {
+    Classification.NORMAL: "Normal",
+    Classification.ANOMALO: "Anómalo",
+}
+
+
+class Method(IntEnum):
+    """Método que produjo la clasificación"""
+
+    PENDIENTE = 0
+    KMEANS = 1
+    HEURISTICA_FALLBACK = 2
+    HEURISTICA_ERROR_KMEANS = 3
+    LISTA_PERMITIDA = 4
+    LISTA_VIGILANCIA = 5
+
+
+_METHOD_TEXT = {
+    Method.PENDIENTE: "Pendiente",
+    Method.HEURISTICA_FALLBACK: "Heurística (Fallback)",
+    Method.HEURISTICA_ERROR_KMEANS: "Heurística (Error K-Means)",
+    Method.LISTA_PERMITIDA: "Lista permitida",
+    Method.LISTA_VIGILANCIA: "Lista de vigilancia",
+}
+
+
+def new_classification_counts():
+    """Contadores [clasificación][método] (incrementos sin lock ni hashing)"""
+    return [[0] * len(Method) for _ in Classification]
+
+
+class PacketRecord:
+    """Campos tipados de un paquete; los textos de la GUI se generan bajo demanda"""
+
+    __slots__ = (
+        "number",
+        "timestamp",
+        "src_ip",
+        "dst_ip",
+        "protocol",
+        "src_port",
+        "dst_port",
+        "length",
+        "classification",
+        "method",
+        "cluster",
+    )
+
+    def __init__(
+        self, number, timestamp, src_ip, dst_ip, protocol, src_port, dst_port, length
+    ):
+        self.number = number
+        self.timestamp = timestamp
+        self.src_ip = src_ip
+        self.dst_ip = dst_ip
+        self.protocol = protocol  # Número de protocolo IP (6 = TCP, 17 = UDP)
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.length = length
+        self.classification = Classification.NORMAL
+        self.method = Method.PENDIENTE
+        self.cluster = -1
+
+    @property
+    def is_anomalous(self):
+        return self.classification == Classification.ANOMALO
+
+    @property
+    def protocol_name(self):
+        return protocol_name(self.protocol)
+
+    def info_text(self):
+        """Texto de la columna Info"""
+        return f"{self.src_port} -> {self.dst_port} [{self.protocol_name}]"
+
+    def method_text(self):
+        if self.method == Method.KMEANS:
+            return f"K-Means (C{self.cluster})"
+        return _METHOD_TEXT[self.method]
+
+    def classification_text(self):
+        """Texto de la columna Clasificación, p. ej. 'Normal (K-Means (C1))'"""
+        return f"{self.classification.label} ({self.method_text()})"
+
+    def as_row(self):
+        """Valores de las 8 columnas de la tabla de la GUI"""
+        return (
+            self.number,
+            self.timestamp,
+            self.src_ip,
+            self.dst_ip,
+            self.protocol_name,
+            self.length,
+            self.info_text(),
+            self.classification_text(),
+        )
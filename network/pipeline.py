@@ -0,0 +1,336 @@
+"""Pipeline multiproceso: captura, fragmentos de flujos y clasificación
+
+El proceso de captura decodifica cada trama y la reparte por el flow_id
+del 5-tupla bidireccional a N procesos trabajadores. Cada trabajador es
+dueño de un fragmento de la tabla de flujos (su propio DetectionEngine sin
+captura), clasifica por lotes y devuelve los PacketRecords al consumidor.
+Los lotes viajan por anillos de memoria compartida (network/shm_ring.py).
+"""
+
+import multiprocessing as mp
+import threading
+import time
+
+from config.settings import (
+    CAPTURE_SNAPLEN,
+    CAPTURE_BUFFER_SIZE,
+    CAPTURE_BACKEND,
+    CAPTURE_STATS_INTERVAL,
+    CLEANUP_INTERVAL,
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_FLUSH_INTERVAL,
+    SHM_RING_CAPACITY,
+    SHM_RING_POLL_INTERVAL,
+)
+from network.capture import build_filter, open_capture
+from network.engine import DetectionEngine, decode_frame
+from network.fast_parser import DLT_EN10MB
+from network.flow_store import TABLES, FlowStore
+from network.packet_record import new_classification_counts
+from network.replay import read_raw_frames
+from network.shm_ring import (
+    SharedRing,
+    pack_fields,
+    pack_record,
+    to_array,
+    unpack_fields,
+    unpack_records,
+)
+
+# Posición de flow_id en las filas de pack_fields()
+_FLOW_ID = 4
+
+
+def _worker_main(
+    input_ring, output_ring, start_time, live, store_root=None, store_written=None
+):
+    """Bucle de un trabajador: seguir flujos y clasificar su fragmento
+
+    En vivo ('live') el trabajador despierta al menos cada CLEANUP_INTERVAL
+    para expirar flujos aunque su fragmento no reciba tráfico. Con
+    'store_root' guarda sus flujos y alertas en su propio FlowStore (los
+    segmentos llevan el pid) y suma lo escrito en 'store_written'.
+    """
+    store = None
+    try:
+        engine = DetectionEngine()
+        engine.start_time = start_time
+        if store_root is not None:
+            store = FlowStore(store_root)
+            store.start()
+            engine.attach_store(store)
+        results = []
+        engine.subscribe(results.append)
+        timeout = CLEANUP_INTERVAL if live else None
+
+        while True:
+            batch = input_ring.get(timeout=timeout)
+            if batch is None:
+                break
+            for number, capture_time, fields in unpack_fields(batch):
+                engine.process_fields(fields, capture_time, number)
+            engine.batcher.flush()
+            if live:
+                engine.maintain_idle()
+            if results:
+                output_ring.put(to_array([pack_record(r) for r in results]))
+                results.clear()
+
+        # Clasificar por última vez los flujos abiertos antes de terminar
+        engine.flow_tracker.flush()
+        engine.batcher.flush()
+        if results:
+            output_ring.put(to_array([pack_record(r) for r in results]))
+    finally:
+        # Aun con error: el consumidor de resultados no debe esperar para siempre
+        output_ring.finish()
+        if store is not None:
+            store.stop()
+            with store_written.get_lock():
+                for index, table in enumerate(TABLES):
+                    store_written[index] += store.written[table]
+
+
+class ShardedPipeline:
+    """Distribuye paquetes entre procesos trabajadores por flujo"""
+
+    def __init__(
+        self,
+        num_workers,
+        batch_size=PIPELINE_BATCH_SIZE,
+        packet_filter=None,
+        ring_capacity=SHM_RING_CAPACITY,
+        flush_interval=PIPELINE_FLUSH_INTERVAL,
+        snaplen=CAPTURE_SNAPLEN,
+        buffer_size=CAPTURE_BUFFER_SIZE,
+        backend=CAPTURE_BACKEND,
+    ):
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ring_capacity = ring_capacity
+        self.packet_filter = build_filter() if packet_filter is None else packet_filter
+        self.snaplen = snaplen
+        self.buffer_size = buffer_size
+        self.backend = backend
+        self.subscribers = []
+        self.packet_count = 0
+        self.classification_counts = new_classification_counts()
+        self.capture_stats = {"received": 0, "dropped": 0}
+        self.start_time = None
+        self.store = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback):
+        """Registrar callback(record) (el orden entre fragmentos no se garantiza)"""
+        self.subscribers.append(callback)
+
+    def attach_store(self, store):
+        """Guardar flujos y alertas en el almacén de 'store'
+
+        Cada trabajador abre su propio FlowStore sobre la misma raíz; al
+        terminar, lo que escribieron se suma a store.written.
+        """
+        self.store = store
+
+    def start(self, start_time, live=False):
+        """Lanzar trabajadores y el hilo consumidor de resultados
+
+        'live' indica captura en vivo: los trabajadores expiran flujos con el
+        reloj de pared (en una reproducción solo cuenta el de los paquetes).
+        """
+        self.start_time = start_time
+        # Un anillo de entrada y otro de salida por trabajador (SPSC)
+        self.input_rings = [
+            SharedRing(self.ring_capacity) for _ in range(self.num_workers)
+        ]
+        self.output_rings = [
+            SharedRing(self.ring_capacity) for _ in range(self.num_workers)
+        ]
+        self.pending = [[] for _ in range(self.num_workers)]
+        # Instante (monotónico) del primer paquete de cada lote pendiente
+        self.pending_since = [0.0] * self.num_workers
+        store_root = None if self.store is None else self.store.root
+        self._store_written = mp.Array("q", len(TABLES))
+        self.workers = [
+            mp.Process(
+                target=_worker_main,
+                args=(
+                    input_ring,
+                    output_ring,
+                    start_time,
+                    live,
+                    store_root,
+                    self._store_written,
+                ),
+                daemon=True,
+            )
+            for input_ring, output_ring in zip(self.input_rings, self.output_rings)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def feed_frame(self, frame, capture_time, linktype=DLT_EN10MB):
+        """Decodificar una trama y enviarla al trabajador de su flujo"""
+        try:
+            fields = decode_frame(frame, linktype)
+            if fields is None:
+                return
+            row = pack_fields(self.packet_count + 1, capture_time, fields)
+        except Exception as e:
+            print(f"[ERROR] Error procesando paquete: {e}")
+            return
+
+        self.packet_count += 1
+        # Mismo flow_id en ambas direcciones: el flujo entero va a un trabajador
+        shard = row[_FLOW_ID] % self.num_workers
+        pending = self.pending[shard]
+        if not pending:
+            self.pending_since[shard] = time.monotonic()
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self._send(shard)
+
+    def _send(self, shard):
+        """Enviar el lote pendiente de un fragmento (error si su trabajador murió)"""
+        self.input_rings[shard].put(
+            to_array(self.pending[shard]), self.workers[shard].is_alive
+        )
+        self.pending[shard] = []
+
+    def flush_pending(self):
+        """Enviar los lotes incompletos a sus trabajadores"""
+        for shard, pending in enumerate(self.pending):
+            if pending:
+                self._send(shard)
+
+    def flush_expired(self):
+        """Enviar los lotes incompletos que esperan más de flush_interval"""
+        now = time.monotonic()
+        for shard, pending in enumerate(self.pending):
+            if pending and now - self.pending_since[shard] >= self.flush_interval:
+                self._send(shard)
+
+    def _read_timeout(self):
+        """Espera máxima de la captura: hasta que venza el lote más antiguo"""
+        waiting = [
+            since for since, pending in zip(self.pending_since, self.pending) if pending
+        ]
+        if not waiting:
+            return 0.05
+        deadline = min(waiting) + self.flush_interval
+        return min(0.05, max(0.0, deadline - time.monotonic()))
+
+    def finish(self):
+        """Enviar lo pendiente, cerrar trabajadores y esperar resultados"""
+        for shard, pending in enumerate(self.pending):
+            if not pending:
+                continue
+            try:
+                self._send(shard)
+            except RuntimeError as e:
+                print(f"[ERROR] Trabajador {shard}: {e}")
+        for ring in self.input_rings:
+            ring.finish()
+
+        self.collector.join()
+        for worker in self.workers:
+            worker.join()
+        if self.store is not None:
+            for index, table in enumerate(TABLES):
+                self.store.written[table] += self._store_written[index]
+        for ring in self.input_rings + self.output_rings:
+            ring.close()
+            ring.unlink()
+
+    def _collect(self):
+        """Entregar a los suscriptores los resultados de todos los trabajadores"""
+        active = list(zip(self.output_rings, self.workers))
+        counts = self.classification_counts
+        while active:
+            received = False
+            for ring, worker in list(active):
+                # Leer la marca (y si el trabajador vive) antes que los datos
+                # para no perder el último lote
+                closed = ring.closed or not worker.is_alive()
+                array = ring.pop()
+                if len(array):
+                    received = True
+                    for record in unpack_records(array):
+                        counts[record.classification][record.method] += 1
+                        for callback in self.subscribers:
+                            callback(record)
+                elif closed:
+                    active.remove((ring, worker))
+            if not received:
+                time.sleep(SHM_RING_POLL_INTERVAL)
+
+    def replay(self, pcap_path, speed=0):
+        """Reproducir una captura y devolver paquetes/s
+
+        speed=0 reparte lo más rápido posible; speed=N respeta los intervalos
+        originales a N veces el ritmo real (como replay_pcap).
+        """
+        wall_start = time.perf_counter()
+        first_capture_time = None
+
+        for frame, capture_time, linktype in read_raw_frames(pcap_path):
+            if first_capture_time is None:
+                first_capture_time = capture_time
+                self.start(capture_time)
+            if speed > 0:
+                target = (capture_time - first_capture_time) / speed
+                delay = target - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            self.feed_frame(frame, capture_time, linktype)
+            if speed > 0:
+                # A ritmo real los lotes no se llenan: no retenerlos
+                self.flush_expired()
+
+        if first_capture_time is not None:
+            self.finish()
+
+        elapsed = time.perf_counter() - wall_start
+        return {
+            "packets": self.packet_count,
+            "elapsed": elapsed,
+            "packets_per_sec": self.packet_count / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def run(self):
+        """Captura en vivo (bloqueante hasta stop())"""
+        print(f"[INFO] Iniciando captura con {self.num_workers} trabajadores...")
+        self.start(time.time(), live=True)
+        capture = open_capture(
+            self.packet_filter, self.snaplen, self.buffer_size, self.backend
+        )
+        last_stats = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                batch = capture.read_batch(self._read_timeout())
+                for frame, capture_time, linktype in batch:
+                    self.feed_frame(frame, capture_time or time.time(), linktype)
+                # No retener lotes incompletos más de flush_interval
+                self.flush_expired()
+
+                if time.monotonic() - last_stats >= CAPTURE_STATS_INTERVAL:
+                    last_stats = time.monotonic()
+                    self.update_capture_stats(capture)
+        finally:
+            self.update_capture_stats(capture)
+            capture.close()
+            self.finish()
+
+    def stop(self):
+        """Solicitar fin de la captura"""
+        self._stop_event.set()
+
+    def update_capture_stats(self, capture):
+        """Acumular los contadores del kernel (recibidos incluye descartados)"""
+        received, dropped = capture.drop_stats()
+        self.capture_stats["received"] += received
+        self.capture_stats["dropped"] += dropped
@@ -0,0 +1,275 @@
+"""Índice compilado de prefijos IP/CIDR (listas permitida y de vigilancia)
+
+Los prefijos se compilan a rangos [inicio, fin] ordenados y sin solapes
+(los contiguos o solapados se fusionan). Los extremos se guardan como
+direcciones empaquetadas en big-endian, que se ordenan igual que los
+enteros: una consulta es inet_aton/inet_pton más un bisect en C, O(log n),
+sin convertir a entero. Las consultas por lotes (contains_many) usan
+NumPy searchsorted sobre los mismos rangos IPv4 como uint32; el motor las
+usa para los paquetes IPv4 de cada microlote (PrefixLists.verdicts).
+
+Formato de archivo: una IP o CIDR por línea; '#' inicia un comentario.
+"""
+
+import os
+import socket
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from config.settings import (
+    ALLOWLIST_PATH,
+    WATCHLIST_PATH,
+    PREFIX_RELOAD_INTERVAL,
+    PREFIX_CACHE_SIZE,
+)
+from network.packet_record import Method
+
+
+class PrefixIndex:
+    """Conjunto inmutable de prefijos con consulta por bisect"""
+
+    def __init__(self, prefixes=()):
+        self._compile(parse_prefix(prefix) for prefix in prefixes)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Índice a partir de tuplas (versión, inicio, fin) ya interpretadas"""
+        index = cls.__new__(cls)
+        index._compile(ranges)
+        return index
+
+    def _compile(self, parsed):
+        ranges = {4: [], 6: []}
+        for version, start, end in parsed:
+            ranges[version].append((start, end))
+
+        starts4, ends4 = _merge(ranges[4])
+        starts6, ends6 = _merge(ranges[6])
+        self.starts4 = [value.to_bytes(4, "big") for value in starts4]
+        self.ends4 = [value.to_bytes(4, "big") for value in ends4]
+        self.starts6 = [value.to_bytes(16, "big") for value in starts6]
+        self.ends6 = [value.to_bytes(16, "big") for value in ends6]
+        self._arrays4 = None
+        # Resultado por IP en texto: el tráfico real repite pocas direcciones
+        self.cache = {}
+
+    def __len__(self):
+        """Número de rangos compilados (tras fusionar)"""
+        return len(self.starts4) + len(self.starts6)
+
+    def __contains__(self, address):
+        """True si la IP (texto) cae en algún prefijo"""
+        found = self.cache.get(address)
+        if found is not None:
+            return found
+
+        if ":" in address:
+            packed = socket.inet_pton(socket.AF_INET6, address)
+            index = bisect_right(self.starts6, packed) - 1
+            found = index >= 0 and packed <= self.ends6[index]
+        else:
+            packed = socket.inet_aton(address)
+            index = bisect_right(self.starts4, packed) - 1
+            found = index >= 0 and packed <= self.ends4[index]
+
+        if len(self.cache) >= PREFIX_CACHE_SIZE:
+            self.cache.clear()
+        self.cache[address] = found
+        return found
+
+    def contains_many(self, values):
+        """Pertenencia de un array de IPv4 como enteros (NumPy searchsorted)"""
+        if self._arrays4 is None:
+            self._arrays4 = tuple(
+                np.frombuffer(b"".join(column), dtype=">u4").astype(np.uint32)
+                for column in (self.starts4, self.ends4)
+            )
+        starts, ends = self._arrays4
+        values = np.asarray(values, dtype=np.uint32)
+        index = np.searchsorted(starts, values, side="right") - 1
+        found = index >= 0
+        found[found] = values[found] <= ends[index[found]]
+        return found
+
+    @classmethod
+    def load(cls, path):
+        """Compilar un archivo de prefijos (inexistente = índice vacío)"""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_ranges(_read_prefixes(handle, path))
+
+
+def ipv4_array(addresses):
+    """IPv4 en texto a array uint32 (big-endian) para contains_many"""
+    return np.frombuffer(b"".join(map(socket.inet_aton, addresses)), dtype=">u4")
+
+
+def parse_prefix(prefix):
+    """'10.0.0.0/8' o una IP suelta a (versión, inicio, fin)
+
+    Lanza ValueError si el prefijo no es válido.
+    """
+    address, _, length = prefix.partition("/")
+    try:
+        if ":" in address:
+            version, bits = 6, 128
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET6, address), "big")
+        else:
+            version, bits = 4, 32
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        raise ValueError(f"dirección no válida: {address}")
+    length = int(length) if length else bits
+    if not 0 <= length <= bits:
+        raise ValueError(f"longitud de prefijo no válida: {length}")
+    # Como ipaddress con strict=False: se ignoran los bits de host
+    host_mask = (1 << (bits - length)) - 1
+    start = value & ~host_mask
+    return version, start, start | host_mask
+
+
+def _read_prefixes(lines, path):
+    """Prefijos válidos de un archivo (los no válidos se informan y se omiten)"""
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            yield parse_prefix(line)
+        except ValueError:
+            print(f"[ERROR] {path}:{number}: prefijo no válido '{line}'")
+
+
+def _merge(ranges):
+    """Ordenar y fusionar rangos solapados o contiguos"""
+    starts, ends = [], []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            if end > ends[-1]:
+                ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class PrefixLists:
+    """Lista permitida y de vigilancia con recarga en caliente
+
+    check_reload() solo compara la fecha de modificación de los archivos
+    cada 'reload_interval' segundos; la recompilación ocurre en un hilo y
+    el índice nuevo sustituye al anterior con una asignación atómica, así
+    que la captura nunca espera.
+    """
+
+    def __init__(
+        self,
+        allowlist_path=ALLOWLIST_PATH,
+        watchlist_path=WATCHLIST_PATH,
+        reload_interval=PREFIX_RELOAD_INTERVAL,
+    ):
+        self.paths = {"allowlist": allowlist_path, "watchlist": watchlist_path}
+        self.reload_interval = reload_interval
+        self.allowlist = PrefixIndex()
+        self.watchlist = PrefixIndex()
+        self.mtimes = {}
+        self.last_check = time.monotonic()
+        self._reloading = False
+        self.reload()
+
+    @property
+    def enabled(self):
+        return bool(len(self.allowlist) or len(self.watchlist))
+
+    def verdict(self, src_ip, dst_ip):
+        """Método que decide el paquete por lista, o None si ninguna aplica
+
+        La lista de vigilancia tiene prioridad: un host permitido que
+        contacta con una IP vigilada sigue siendo anómalo.
+        """
+        watchlist = self.watchlist
+        if src_ip in watchlist or dst_ip in watchlist:
+            return Method.LISTA_VIGILANCIA
+        allowlist = self.allowlist
+        if src_ip in allowlist or dst_ip in allowlist:
+            return Method.LISTA_PERMITIDA
+        return None
+
+    def verdicts(self, src_ips, dst_ips):
+        """verdict() de cada paquete de un lote
+
+        Los paquetes IPv4 se resuelven juntos con contains_many (NumPy);
+        los IPv6 uno a uno.
+        """
+        verdicts = [None] * len(src_ips)
+        ipv4 = []
+        for index, src_ip in enumerate(src_ips):
+            if ":" in src_ip:
+                verdicts[index] = self.verdict(src_ip, dst_ips[index])
+            else:
+                ipv4.append(index)
+        if not ipv4:
+            return verdicts
+
+        src = ipv4_array([src_ips[index] for index in ipv4])
+        dst = ipv4_array([dst_ips[index] for index in ipv4])
+        watchlist, allowlist = self.watchlist, self.allowlist
+        watched = _contains_either(watchlist, src, dst)
+        allowed = _contains_either(allowlist, src, dst)
+        for index, is_watched, is_allowed in zip(ipv4, watched, allowed):
+            if is_watched:
+                verdicts[index] = Method.LISTA_VIGILANCIA
+            elif is_allowed:
+                verdicts[index] = Method.LISTA_PERMITIDA
+        return verdicts
+
+    def reload(self):
+        """Compilar ahora las listas cuyos archivos cambiaron"""
+        for name, path in self.paths.items():
+            mtime = _mtime(path)
+            if mtime == self.mtimes.get(name):
+                continue
+            self.mtimes[name] = mtime
+            index = PrefixIndex.load(path)
+            setattr(self, name, index)
+            if mtime is not None:
+                print(f"[INFO] {path}: {len(index)} rangos cargados")
+
+    def check_reload(self):
+        """Lanzar la recarga en segundo plano si algún archivo cambió"""
+        now = time.monotonic()
+        if self._reloading or now - self.last_check < self.reload_interval:
+            return
+        self.last_check = now
+        if all(
+            _mtime(path) == self.mtimes.get(name) for name, path in self.paths.items()
+        ):
+            return
+        self._reloading = True
+        threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"[ERROR] Error recargando listas de prefijos: {e}")
+        finally:
+            self._reloading = False
+
+
+def _contains_either(index, src, dst):
+    """Lista de bool: origen o destino en el índice (sin consultar si está vacío)"""
+    if not index.starts4:
+        return [False] * len(src)
+    return (index.contains_many(src) | index.contains_many(dst)).tolist()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
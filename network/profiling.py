@@ -0,0 +1,198 @@
+"""Instrumentación por etapas: ventanas de medición e histogramas
+
+Los histogramas son log-lineales al estilo HDR: cada potencia de 2 se
+divide en 2**SUB_BUCKET_BITS sub-cubetas (error relativo < 7 %), con coste
+de registro constante y memoria fija.
+
+Las etapas no se cronometran siempre: arm() sustituye sus funciones por
+versiones cronometradas durante las siguientes 'window' llamadas y después
+restaura las originales. Cada arm() cierra además las ventanas que no se
+completaron desde el anterior, así que una etapa poco frecuente nunca
+queda cronometrada más de un intervalo. Fuera de esas ventanas el coste
+es nulo.
+
+Las etapas deben ser atributos de instancia ya existentes: solo se cambia
+su valor, nunca se añaden ni se borran atributos del objeto ni se toca su
+__dict__ (eso desactiva las optimizaciones de acceso a atributos del
+intérprete y encarece todo el objeto aunque la ventana esté cerrada).
+"""
+
+import json
+import threading
+import time
+
+from config.settings import PROFILING_WINDOW
+
+SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_BUCKET_COUNT = 64 * _SUB_BUCKETS
+PERCENTILES = (50, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Histograma de latencias en nanosegundos"""
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value):
+        """Registrar una latencia (ns)"""
+        bits = value.bit_length()
+        if bits <= SUB_BUCKET_BITS:
+            index = value
+        else:
+            # Exponente y los SUB_BUCKET_BITS bits siguientes al más alto
+            shift = bits - SUB_BUCKET_BITS - 1
+            index = ((shift + 1) << SUB_BUCKET_BITS) | (
+                (value >> shift) & (_SUB_BUCKETS - 1)
+            )
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile):
+        """Valor (ns) por debajo del cual cae el 'percentile' % de muestras"""
+        if not self.total:
+            return 0
+        target = self.total * percentile / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_bucket_upper_bound(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        """Muestras <= cada límite (ns, ascendentes), al estilo Prometheus"""
+        counts = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            while index < _BUCKET_COUNT and _bucket_upper_bound(index) <= bound:
+                seen += self.counts[index]
+                index += 1
+            counts.append(seen)
+        return counts
+
+    def reset(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+
+def _bucket_upper_bound(index):
+    """Mayor valor que cae en la cubeta 'index'"""
+    if index < _SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    mantissa = _SUB_BUCKETS | (index & (_SUB_BUCKETS - 1))
+    return ((mantissa + 1) << shift) - 1
+
+
+class Profiler:
+    """Conjunto de histogramas por etapa del pipeline"""
+
+    def __init__(self, window=PROFILING_WINDOW):
+        self.window = window
+        self.histograms = {}
+        self.hooks = []
+        # Etapa -> (objeto, atributo, original, versión cronometrada)
+        self.armed = {}
+        # Las etapas pueden llamarse desde varios hilos (p. ej. el temporizador
+        # del MicroBatcher): instalar y restaurar ocurre una sola vez bajo lock
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        """Histograma de una etapa (se crea al primer uso)"""
+        if stage not in self.histograms:
+            self.histograms[stage] = LatencyHistogram()
+        return self.histograms[stage]
+
+    def hook(self, target, attribute, stage):
+        """Registrar target.attribute (atributo de instancia) como etapa"""
+        # Sin vars(target): materializar el __dict__ también frena los accesos
+        if hasattr(type(target), attribute) or not hasattr(target, attribute):
+            raise ValueError(f"{attribute} no es un atributo de instancia")
+        self.histogram(stage)
+        self.hooks.append((target, attribute, stage))
+
+    def arm(self):
+        """Abrir una ventana de 'window' llamadas en cada etapa registrada"""
+        with self._lock:
+            for stage in list(self.armed):
+                self._restore(stage)
+            for target, attribute, stage in self.hooks:
+                self._install(target, attribute, stage)
+
+    def _install(self, target, attribute, stage):
+        original = getattr(target, attribute)
+        record = self.histogram(stage).record
+        clock = time.perf_counter_ns
+        remaining = [self.window]
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = original(*args, **kwargs)
+            record(clock() - start)
+            remaining[0] -= 1
+            if remaining[0] <= 0:
+                self._close(stage, timed)
+            return result
+
+        self.armed[stage] = (target, attribute, original, timed)
+        setattr(target, attribute, timed)
+
+    def _close(self, stage, timed):
+        """Cerrar la ventana de 'timed' si sigue instalada (una sola vez)"""
+        with self._lock:
+            entry = self.armed.get(stage)
+            if entry is not None and entry[3] is timed:
+                self._restore(stage)
+
+    def _restore(self, stage):
+        """Reponer la función original (con el lock tomado)"""
+        target, attribute, original, _ = self.armed.pop(stage)
+        setattr(target, attribute, original)
+
+    def snapshot(self):
+        """Percentiles por etapa en microsegundos"""
+        stages = {}
+        for stage, histogram in self.histograms.items():
+            stages[stage] = {
+                "samples": histogram.total,
+                **{
+                    f"p{percentile:g}_us": histogram.percentile(percentile) / 1000
+                    for percentile in PERCENTILES
+                },
+                "max_us": histogram.max / 1000,
+            }
+        return stages
+
+
+def format_profile(profile):
+    """Tabla de texto de un perfil (ver DetectionEngine.profile_snapshot)"""
+    lines = [
+        f"Paquetes/s: {profile['packets_per_sec']:,.0f}   "
+        f"Flujos en tabla: {profile['flows']}",
+        f"{'Etapa':<16}{'muestras':>10}{'p50 us':>10}{'p99 us':>10}"
+        f"{'p99.9 us':>10}{'max us':>10}",
+    ]
+    for stage, values in profile["stages"].items():
+        lines.append(
+            f"{stage:<16}{values['samples']:>10}{values['p50_us']:>10.1f}"
+            f"{values['p99_us']:>10.1f}{values['p99.9_us']:>10.1f}"
+            f"{values['max_us']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def dump_profile(profile, path):
+    """Guardar un perfil como JSON"""
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(profile, handle, indent=2)
@@ -0,0 +1,338 @@
+"""Transporte entre procesos sobre memoria compartida, sin serializar
+
+Anillo de un solo productor y un solo consumidor (SPSC) con registros de
+tamaño fijo. El productor solo escribe 'head' y el consumidor solo 'tail',
+así que no hacen falta locks: cada índice tiene un único escritor y cada
+lado publica su índice después de copiar los datos.
+"""
+
+import socket
+import struct
+import time
+import zlib
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config.settings import SHM_RING_CAPACITY, SHM_RING_POLL_INTERVAL
+from network.packet_record import PacketRecord, Classification, Method
+
+# Registro fijo de un paquete; las IPs van empaquetadas (4 o 16 bytes)
+RECORD_DTYPE = np.dtype(
+    [
+        ("number", "<u8"),
+        ("timestamp", "<f8"),
+        ("src_ip", "S16"),
+        ("dst_ip", "S16"),
+        ("flow_id", "<u4"),
+        ("length", "<u4"),
+        ("src_port", "<u2"),
+        ("dst_port", "<u2"),
+        ("cluster", "<i2"),
+        ("protocol", "u1"),
+        ("ip_version", "u1"),
+        ("classification", "u1"),
+        ("method", "u1"),
+    ],
+    align=True,
+)
+
+# Cabecera: head y tail en líneas de caché distintas (palabras de 8 bytes)
+_HEAD = 0
+_CLOSED = 1
+_TAIL = 8
+_CAPACITY = 16
+_HEADER_WORDS = 24
+_HEADER_SIZE = _HEADER_WORDS * 8
+
+_PORTS = struct.Struct("<HHB")
+_CLASSIFICATIONS = tuple(Classification)
+_METHODS = tuple(Method)
+
+
+# El tráfico real repite pocas IPs: cachear las conversiones texto <-> bytes
+@lru_cache(maxsize=65536)
+def pack_ip(address):
+    """IP en texto a bytes empaquetados y versión"""
+    if ":" in address:
+        return socket.inet_pton(socket.AF_INET6, address), 6
+    return socket.inet_aton(address), 4
+
+
+@lru_cache(maxsize=65536)
+def unpack_ip(packed, version):
+    """Bytes empaquetados a texto (numpy recorta los ceros finales)"""
+    if version == 4:
+        return socket.inet_ntoa(packed.ljust(4, b"\0"))
+    return socket.inet_ntop(socket.AF_INET6, packed.ljust(16, b"\0"))
+
+
+def flow_id(src, dst, src_port, dst_port, protocol):
+    """Identificador estable del flujo bidireccional (mismo en todo proceso)"""
+    if (src, src_port) <= (dst, dst_port):
+        key = src + dst + _PORTS.pack(src_port, dst_port, protocol)
+    else:
+        key = dst + src + _PORTS.pack(dst_port, src_port, protocol)
+    return zlib.crc32(key)
+
+
+def pack_fields(number, timestamp, fields):
+    """Fila de RECORD_DTYPE para un paquete aún sin clasificar"""
+    src_ip, dst_ip, protocol, src_port, dst_port, length = fields
+    src, version = pack_ip(src_ip)
+    dst, _ = pack_ip(dst_ip)
+    return (
+        number,
+        timestamp,
+        src,
+        dst,
+        flow_id(src, dst, src_port, dst_port, protocol),
+        length,
+        src_port,
+        dst_port,
+        -1,
+        protocol,
+        version,
+        Classification.NORMAL,
+        Method.PENDIENTE,
+    )
+
+
+def pack_record(record):
+    """Fila de RECORD_DTYPE para un PacketRecord (con su clasificación)"""
+    src, version = pack_ip(record.src_ip)
+    dst, _ = pack_ip(record.dst_ip)
+    return (
+        record.number,
+        record.timestamp,
+        src,
+        dst,
+        flow_id(src, dst, record.src_port, record.dst_port, record.protocol),
+        record.length,
+        record.src_port,
+        record.dst_port,
+        record.cluster,
+        record.protocol,
+        version,
+        record.classification,
+        record.method,
+    )
+
+
+def to_array(rows):
+    """Lista de filas empaquetadas a array estructurado"""
+    return np.array(rows, dtype=RECORD_DTYPE)
+
+
+def unpack_fields(array):
+    """Array estructurado a tuplas (number, timestamp, fields)"""
+    return [
+        (
+            number,
+            timestamp,
+            (
+                unpack_ip(src, version),
+                unpack_ip(dst, version),
+                protocol,
+                src_port,
+                dst_port,
+                length,
+            ),
+        )
+        for (
+            number,
+            timestamp,
+            src,
+            dst,
+            _,
+            length,
+            src_port,
+            dst_port,
+            _,
+            protocol,
+            version,
+            _,
+            _,
+        ) in array.tolist()
+    ]
+
+
+def unpack_records(array):
+    """Array estructurado a PacketRecords"""
+    records = []
+    for (
+        number,
+        timestamp,
+        src,
+        dst,
+        _,
+        length,
+        src_port,
+        dst_port,
+        cluster,
+        protocol,
+        version,
+        classification,
+        method,
+    ) in array.tolist():
+        record = PacketRecord(
+            number,
+            timestamp,
+            unpack_ip(src, version),
+            unpack_ip(dst, version),
+            protocol,
+            src_port,
+            dst_port,
+            length,
+        )
+        record.classification = _CLASSIFICATIONS[classification]
+        record.method = _METHODS[method]
+        record.cluster = cluster
+        records.append(record)
+    return records
+
+
+class SharedRing:
+    """Anillo SPSC de registros RECORD_DTYPE en memoria compartida
+
+    Se crea en el proceso padre y se pasa a un hijo como argumento de
+    multiprocessing.Process (con fork se hereda; con spawn se adjunta por
+    nombre). Solo el creador debe llamar a unlink().
+    """
+
+    def __init__(self, capacity=SHM_RING_CAPACITY, name=None):
+        if name is None:
+            # Capacidad potencia de 2: índice = secuencia & máscara
+            capacity = 1 << max(capacity - 1, 1).bit_length()
+            size = _HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.header = np.ndarray((_HEADER_WORDS,), dtype="<u8", buffer=self.shm.buf)
+        if name is None:
+            self.header[:] = 0
+            self.header[_CAPACITY] = capacity
+        self.capacity = int(self.header[_CAPACITY])
+        self.mask = self.capacity - 1
+        self.slots = np.ndarray(
+            (self.capacity,),
+            dtype=RECORD_DTYPE,
+            buffer=self.shm.buf,
+            offset=_HEADER_SIZE,
+        )
+
+    def __reduce__(self):
+        return (SharedRing, (0, self.shm.name))
+
+    def __len__(self):
+        return int(self.header[_HEAD]) - int(self.header[_TAIL])
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def closed(self):
+        """El productor terminó (puede haber registros sin leer)"""
+        return bool(self.header[_CLOSED])
+
+    def push(self, array):
+        """Escribir cuantos registros quepan; devuelve cuántos se escribieron"""
+        head = int(self.header[_HEAD])
+        free = self.capacity - (head - int(self.header[_TAIL]))
+        count = min(len(array), free)
+        if count <= 0:
+            return 0
+
+        start = head & self.mask
+        first = min(count, self.capacity - start)
+        self.slots[start : start + first] = array[:first]
+        if count > first:
+            self.slots[: count - first] = array[first:count]
+
+        # Publicar solo cuando los datos ya están copiados
+        self.header[_HEAD] = head + count
+        return count
+
+    def put(self, array, alive=None):
+        """Escribir todos los registros, esperando mientras el anillo esté lleno
+
+        'alive' (p. ej. Process.is_alive del consumidor) evita esperar para
+        siempre a un consumidor que ya terminó: se lanza RuntimeError.
+        """
+        written = self.push(array)
+        while written < len(array):
+            if alive is not None and not alive():
+                raise RuntimeError("el consumidor del anillo terminó")
+            time.sleep(SHM_RING_POLL_INTERVAL)
+            written += self.push(array[written:])
+
+    def peek(self, max_count=None):
+        """Vista sin copia de los registros contiguos disponibles
+
+        La vista es válida hasta el siguiente release(); los registros que
+        cruzan el final del anillo llegan en la siguiente llamada.
+        """
+        tail = int(self.header[_TAIL])
+        count = int(self.header[_HEAD]) - tail
+        if max_count is not None:
+            count = min(count, max_count)
+        start = tail & self.mask
+        count = min(count, self.capacity - start)
+        return self.slots[start : start + count]
+
+    def release(self, count):
+        """Liberar registros ya leídos para que el productor los reutilice"""
+        self.header[_TAIL] = int(self.header[_TAIL]) + count
+
+    def pop(self, max_count=None):
+        """Leer y liberar los registros disponibles (copia)"""
+        chunks = []
+        remaining = max_count
+        while remaining is None or remaining > 0:
+            view = self.peek(remaining)
+            if not len(view):
+                break
+            chunks.append(view.copy())
+            self.release(len(view))
+            if remaining is not None:
+                remaining -= len(view)
+
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(chunks)
+
+    def get(self, max_count=None, timeout=None):
+        """Esperar registros; None cuando el productor cerró y no quedan
+
+        Con 'timeout' (segundos) devuelve un array vacío si no llegó nada.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Leer la marca antes que los datos para no perder el último lote
+            closed = self.closed
+            array = self.pop(max_count)
+            if len(array):
+                return array
+            if closed:
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                return array
+            time.sleep(SHM_RING_POLL_INTERVAL)
+
+    def finish(self):
+        """Marcar el fin de la producción"""
+        self.header[_CLOSED] = 1
+
+    def close(self):
+        """Soltar el mapeo en este proceso"""
+        del self.slots, self.header
+        self.shm.close()
+
+    def unlink(self):
+        """Eliminar el segmento compartido (solo el creador)"""
+        self.shm.unlink()
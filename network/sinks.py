@@ -0,0 +1,80 @@
+"""Destinos de salida para paquetes clasificados (modo sin interfaz)"""
+
+import csv
+import gzip
+import json
+
+# Columnas escritas por cada PacketRecord entregado por DetectionEngine
+RECORD_FIELDS = [
+    "no",
+    "tiempo",
+    "ip_origen",
+    "ip_destino",
+    "protocolo",
+    "puerto_origen",
+    "puerto_destino",
+    "tamano",
+    "clasificacion",
+    "metodo",
+]
+
+
+def record_values(record):
+    """Valores de un PacketRecord en el orden de RECORD_FIELDS"""
+    return (
+        record.number,
+        record.timestamp,
+        record.src_ip,
+        record.dst_ip,
+        record.protocol_name,
+        record.src_port,
+        record.dst_port,
+        record.length,
+        record.classification.label,
+        record.method_text(),
+    )
+
+
+class _FileSink:
+    """Base común para sinks que escriben en un archivo (gzip si acaba en .gz)
+
+    'fields' y 'values' permiten escribir otras filas además de PacketRecord
+    (p. ej. las del almacén de flujos).
+    """
+
+    def __init__(self, path, newline=None, fields=RECORD_FIELDS, values=record_values):
+        if path.endswith(".gz"):
+            self.file = gzip.open(path, "wt", encoding="utf-8", newline=newline)
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline=newline)
+        self.fields = fields
+        self.values = values
+
+    def close(self):
+        """Vaciar buffers y cerrar el archivo"""
+        self.file.close()
+
+
+class JsonLinesSink(_FileSink):
+    """Escribe un objeto JSON por línea"""
+
+    def __call__(self, record):
+        self.file.write(
+            json.dumps(dict(zip(self.fields, self.values(record))), ensure_ascii=False)
+            + "\n"
+        )
+
+
+class CsvSink(_FileSink):
+    """Escribe registros CSV con encabezado"""
+
+    def __init__(self, path, fields=RECORD_FIELDS, values=record_values):
+        super().__init__(path, "", fields, values)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(fields)
+
+    def __call__(self, record):
+        self.writer.writerow(self.values(record))
+
+
+SINKS = {"jsonl": JsonLinesSink, "csv": CsvSink}